@@ -583,6 +583,10 @@ class ReplayUploader:
         self.retry_count = config.get('retry_count', 3)
         self.retry_delay = config.get('retry_delay', 5)
 
+        # HTTPセッション（API・S3への接続を再利用し、アップロードごとのTCP/TLSハンドシェイクを省略）
+        # リトライは各メソッドで行うため、アダプタ側ではリトライしない
+        self.session = requests.Session()
+
         # ゲームプレイ動画設定
         capture_config = config.get('capture', {})
         self.upload_gameplay_video = capture_config.get('upload_gameplay_video', True)
@@ -643,7 +647,7 @@ class ReplayUploader:
             try:
                 with open(file_path, 'rb') as f:
                     files = {'file': (file_path.name, f, 'application/octet-stream')}
-                    response = requests.post(
+                    response = self.session.post(
                         self.api_url,
                         headers=headers,
                         files=files,
@@ -761,7 +765,7 @@ class ReplayUploader:
         """動画アップロード用Presigned URLをサーバーから取得"""
         try:
             url = f"{self.api_base_url}/api/upload/video/presign"
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers={
                     'X-Api-Key': self.api_key,
@@ -796,7 +800,7 @@ class ReplayUploader:
 
                 logger.info(f"動画データ読み込み完了: {len(file_data)} bytes")
 
-                response = requests.put(
+                response = self.session.put(
                     upload_url,
                     data=file_data,
                     headers={
@@ -891,7 +895,7 @@ class ReplayUploader:
             try:
                 # Presigned URLを使用する場合、署名に含まれていないヘッダーを
                 # 送信すると403エラーになるため、Content-Typeは送信しない
-                response = requests.put(
+                response = self.session.put(
                     url,
                     data=data,
                     timeout=300  # 5分タイムアウト
@@ -920,7 +924,7 @@ class ReplayUploader:
         """動画マルチパートアップロード完了API呼び出し"""
         try:
             url = f"{self.api_base_url}/api/upload/video/complete"
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers={
                     'X-Api-Key': self.api_key,
@@ -950,7 +954,7 @@ class ReplayUploader:
         """動画マルチパートアップロード中止API呼び出し"""
         try:
             url = f"{self.api_base_url}/api/upload/video/abort"
-            response = requests.post(
+            response = self.session.post(
                 url,
                 headers={
                     'X-Api-Key': self.api_key,
@@ -5,22 +5,86 @@ rendererに依存しない、純粋なメタデータ解析機能を提供する
 艦船名・クラン情報はWoWS APIから取得する。
 """
 
-import json
+import mmap
+import os
 import struct
 import logging
-import urllib.request
 import urllib.parse
-from datetime import datetime
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, List
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.replay_datetime import parse_replay_datetime
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# キャッシュ
-_SHIP_NAME_CACHE: Dict[int, str] = {}  # ship_id -> ship_name
-_PLAYER_ACCOUNT_CACHE: Dict[str, Optional[int]] = {}  # player_name -> account_id
-_CLAN_INFO_CACHE: Dict[int, Optional[dict]] = {}  # account_id -> clan_info
+# キャッシュ（参照順を保持し、上限超過時は最も古く参照されたものから破棄するLRU）
+_SHIP_NAME_CACHE: "OrderedDict[int, str]" = OrderedDict()  # ship_id -> ship_name
+_PLAYER_ACCOUNT_CACHE: "OrderedDict[str, Optional[int]]" = OrderedDict()  # player_name -> account_id
+_CLAN_INFO_CACHE: "OrderedDict[int, Optional[dict]]" = OrderedDict()  # account_id -> clan_info
+
+# 各キャッシュの最大件数（ウォームコンテナが長時間稼働してもメモリが増え続けないよう上限を設ける）
+API_CACHE_MAX_SIZE = 8192
+
+# キャッシュ未登録を表す番兵（取得失敗をNoneでキャッシュしているため区別に使用）
+_NOT_CACHED = object()
+
+# リプレイファイルのヘッダー（Magic number, Block 1のサイズ, Block 2のサイズ）
+_REPLAY_HEADER = struct.Struct("<III")
+
+# WoWS APIの1リクエストで指定できるID数の上限
+WOWS_API_MAX_IDS = 100
+
+# HTTPセッション（ウォームコンテナ内でWoWS APIへのTCP/TLS接続を再利用）
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=2,
+        max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+
+def _get_cached(cache: OrderedDict, key):
+    """キャッシュから値を取得し、最近参照したものとして末尾に移動（未登録時は_NOT_CACHED）"""
+    value = cache.get(key, _NOT_CACHED)
+    if value is not _NOT_CACHED:
+        cache.move_to_end(key)
+    return value
+
+
+def _set_cached(cache: OrderedDict, key, value) -> None:
+    """キャッシュに値を格納（上限を超えた場合は最も古く参照されたものから破棄）"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > API_CACHE_MAX_SIZE:
+        cache.popitem(last=False)
+
+
+def _get_json(url: str) -> dict:
+    """
+    WoWS APIにGETリクエストを送信し、レスポンスJSONを返す
+
+    Args:
+        url: リクエストURL
+
+    Returns:
+        レスポンスJSONの辞書
+
+    Raises:
+        requests.RequestException: 通信エラー・HTTPエラーの場合
+    """
+    response = _session.get(url, timeout=5)
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 
 class ReplayMetadataParser:
@@ -50,33 +114,34 @@ class ReplayMetadataParser:
         """
         try:
             with open(replay_path, "rb") as f:
-                # 最初の12バイトのヘッダーを読み取り
-                header = f.read(12)
-                if len(header) < 12:
+                # 最初の12バイトのヘッダーがあるか確認（空ファイルはmmapできないため先に判定）
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size < _REPLAY_HEADER.size:
                     logger.error("リプレイファイルが不正です: ヘッダー情報が不足しています")
                     return None
 
-                # ヘッダーを解析
-                magic = struct.unpack("<I", header[0:4])[0]
-                _block1_size = struct.unpack("<I", header[4:8])[0]  # noqa: F841
-                json_size = struct.unpack("<I", header[8:12])[0]
-
-                # Magic numberの確認（任意）
-                if magic != 0x11343212:
-                    logger.warning(f"予期しないMagic number: 0x{magic:08x}")
-
-                # JSONブロック（Block 2）を読み取り
-                json_data = f.read(json_size)
+                # ファイルをmmapし、JSONブロックをbytesにコピーせずorjsonへ渡す
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # ヘッダーを解析（3フィールドをスライスせず一度に読み取る）
+                    magic, _block1_size, json_size = _REPLAY_HEADER.unpack_from(mm)
+
+                    # Magic numberの確認（任意）
+                    if magic != 0x11343212:
+                        logger.warning(f"予期しないMagic number: 0x{magic:08x}")
+
+                    # JSONブロック（Block 2）の範囲を確認
+                    json_end = _REPLAY_HEADER.size + json_size
+                    if file_size < json_end:
+                        logger.error(
+                            f"リプレイファイルが不正です: JSONデータが不完全です"
+                            f"（期待: {json_size}, 実際: {file_size - _REPLAY_HEADER.size}）"
+                        )
+                        return None
 
-                if len(json_data) < json_size:
-                    logger.error(
-                        f"リプレイファイルが不正です: JSONデータが不完全です"
-                        f"（期待: {json_size}, 実際: {len(json_data)}）"
-                    )
-                    return None
+                    # JSONをパース（mmapを閉じる前にmemoryviewを解放する）
+                    with memoryview(mm)[_REPLAY_HEADER.size : json_end] as json_view:
+                        metadata = orjson.loads(json_view)
 
-                # JSONをパース
-                metadata = json.loads(json_data.decode("utf-8"))
                 logger.info("リプレイメタデータの解析に成功しました")
 
                 return metadata
@@ -103,16 +168,15 @@ class ReplayMetadataParser:
                 logger.warning("メタデータにdateTime情報がありません")
                 return None
 
-            try:
-                # パース (フォーマット: "DD.MM.YYYY HH:MM:SS")
-                dt = datetime.strptime(date_time_str, "%d.%m.%Y %H:%M:%S")
-                # 日本語形式にフォーマット
-                formatted = dt.strftime("%Y年%m月%d日 %H:%M:%S")
-                return formatted
-            except ValueError:
+            # パース (フォーマット: "DD.MM.YYYY HH:MM:SS")
+            dt = parse_replay_datetime(date_time_str)
+            if dt is None:
                 logger.warning(f"日時フォーマットの解析に失敗: {date_time_str}")
                 return date_time_str
 
+            # 日本語形式にフォーマット（strftimeのロケール処理を省略）
+            return f"{dt.year:04d}年{dt.month:02d}月{dt.day:02d}日 {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+
         except Exception as e:
             logger.error(f"対戦時間の抽出エラー: {e}", exc_info=True)
             return None
@@ -132,19 +196,19 @@ class ReplayMetadataParser:
             # matchGroupキーからゲームタイプを取得
             match_group = metadata.get("matchGroup")
             if match_group:
-                logger.info(f"ゲームタイプ (matchGroup): {match_group}")
+                logger.info("ゲームタイプ (matchGroup): %s", match_group)
                 return match_group
 
             # gameLogicキーから取得を試みる
             game_logic = metadata.get("gameLogic")
             if game_logic:
-                logger.info(f"ゲームタイプ (gameLogic): {game_logic}")
+                logger.info("ゲームタイプ (gameLogic): %s", game_logic)
                 return game_logic
 
             # battleTypeキーから取得を試みる
             battle_type = metadata.get("battleType")
             if battle_type:
-                logger.info(f"ゲームタイプ (battleType): {battle_type}")
+                logger.info("ゲームタイプ (battleType): %s", battle_type)
                 return battle_type
 
             logger.warning("メタデータにゲームタイプ情報がありません")
@@ -166,8 +230,9 @@ class ReplayMetadataParser:
             艦船名（取得できない場合は None）
         """
         # キャッシュから検索
-        if ship_id in _SHIP_NAME_CACHE:
-            return _SHIP_NAME_CACHE[ship_id]
+        ship_name = _get_cached(_SHIP_NAME_CACHE, ship_id)
+        if ship_name is not _NOT_CACHED:
+            return ship_name
 
         try:
             url = (
@@ -175,22 +240,55 @@ class ReplayMetadataParser:
                 f"?application_id={cls.WOWS_API_APP_ID}&ship_id={ship_id}&fields=name&language=en"
             )
 
-            with urllib.request.urlopen(url, timeout=5) as response:
-                data = json.loads(response.read().decode("utf-8"))
+            data = _get_json(url)
 
-                if data.get("status") == "ok" and "data" in data:
-                    ship_data = data["data"].get(str(ship_id))
-                    if ship_data and "name" in ship_data:
-                        ship_name = ship_data["name"]
-                        logger.info(f"APIから艦船名を取得: {ship_id} -> {ship_name}")
-                        _SHIP_NAME_CACHE[ship_id] = ship_name
-                        return ship_name
+            if data.get("status") == "ok" and "data" in data:
+                ship_data = data["data"].get(str(ship_id))
+                if ship_data and "name" in ship_data:
+                    ship_name = ship_data["name"]
+                    logger.info("APIから艦船名を取得: %s -> %s", ship_id, ship_name)
+                    _set_cached(_SHIP_NAME_CACHE, ship_id, ship_name)
+                    return ship_name
 
         except Exception as e:
             logger.warning(f"APIからの艦船名取得エラー (ID: {ship_id}): {e}")
 
         return None
 
+    @classmethod
+    def fetch_ship_names_from_api(cls, ship_ids: List[int]) -> None:
+        """
+        WoWS APIから複数の艦船名をまとめて取得し、キャッシュに格納
+
+        ship_idをカンマ区切りで指定し、1リクエストで取得する。
+        取得できなかった艦船はキャッシュせず、get_ship_nameの個別取得に任せる。
+
+        Args:
+            ship_ids: 艦船IDのリスト
+        """
+        missing_ids = sorted({ship_id for ship_id in ship_ids if ship_id not in _SHIP_NAME_CACHE})
+
+        for i in range(0, len(missing_ids), WOWS_API_MAX_IDS):
+            chunk = missing_ids[i : i + WOWS_API_MAX_IDS]
+            try:
+                url = (
+                    f"https://api.worldofwarships.asia/wows/encyclopedia/ships/"
+                    f"?application_id={cls.WOWS_API_APP_ID}&ship_id={','.join(map(str, chunk))}"
+                    f"&fields=name&language=en"
+                )
+
+                data = _get_json(url)
+
+                if data.get("status") == "ok" and "data" in data:
+                    for ship_id in chunk:
+                        ship_data = data["data"].get(str(ship_id))
+                        if ship_data and "name" in ship_data:
+                            _set_cached(_SHIP_NAME_CACHE, ship_id, ship_data["name"])
+                    logger.info("APIから艦船名を一括取得: %d件", len(chunk))
+
+            except Exception as e:
+                logger.warning(f"APIからの艦船名一括取得エラー ({len(chunk)}件): {e}")
+
     @classmethod
     def get_ship_name(cls, ship_id: int) -> str:
         """
@@ -219,8 +317,9 @@ class ReplayMetadataParser:
             account_id（取得できない場合は None）
         """
         # キャッシュから検索
-        if player_name in _PLAYER_ACCOUNT_CACHE:
-            return _PLAYER_ACCOUNT_CACHE[player_name]
+        account_id = _get_cached(_PLAYER_ACCOUNT_CACHE, player_name)
+        if account_id is not _NOT_CACHED:
+            return account_id
 
         try:
             encoded_name = urllib.parse.quote(player_name)
@@ -229,32 +328,87 @@ class ReplayMetadataParser:
                 f"?application_id={cls.WOWS_API_APP_ID}&search={encoded_name}"
             )
 
-            with urllib.request.urlopen(url, timeout=5) as response:
-                data = json.loads(response.read().decode("utf-8"))
+            data = _get_json(url)
 
-                if data.get("status") == "ok" and "data" in data:
-                    players = data["data"]
-                    if players and len(players) > 0:
-                        # 完全一致を探す
-                        for player in players:
-                            if player.get("nickname") == player_name:
-                                account_id = player.get("account_id")
-                                logger.info(f"APIからアカウントIDを取得: {player_name} -> {account_id}")
-                                _PLAYER_ACCOUNT_CACHE[player_name] = account_id
-                                return account_id
-
-                        # 完全一致がない場合は最初の結果を使用
-                        account_id = players[0].get("account_id")
-                        logger.info(f"APIからアカウントIDを取得（部分一致）: {player_name} -> {account_id}")
-                        _PLAYER_ACCOUNT_CACHE[player_name] = account_id
+            # レート制限（REQUEST_LIMIT_EXCEEDED）などはHTTP 200・status=errorで返るため、
+            # 「見つからない」とは区別してキャッシュせず、次回に再取得する
+            if data.get("status") != "ok" or "data" not in data:
+                logger.warning(f"APIからのアカウントID取得エラー ({player_name}): {data.get('error')}")
+                return None
+
+            players = data["data"]
+            if players:
+                # 完全一致を探す
+                for player in players:
+                    if player.get("nickname") == player_name:
+                        account_id = player.get("account_id")
+                        logger.info("APIからアカウントIDを取得: %s -> %s", player_name, account_id)
+                        _set_cached(_PLAYER_ACCOUNT_CACHE, player_name, account_id)
                         return account_id
 
+                # 完全一致がない場合は最初の結果を使用
+                account_id = players[0].get("account_id")
+                logger.info("APIからアカウントIDを取得（部分一致）: %s -> %s", player_name, account_id)
+                _set_cached(_PLAYER_ACCOUNT_CACHE, player_name, account_id)
+                return account_id
+
         except Exception as e:
+            # 通信エラーは一時的なものとしてキャッシュしない
             logger.warning(f"APIからのアカウントID取得エラー ({player_name}): {e}")
+            return None
 
-        _PLAYER_ACCOUNT_CACHE[player_name] = None
+        _set_cached(_PLAYER_ACCOUNT_CACHE, player_name, None)
         return None
 
+    @classmethod
+    def fetch_account_ids_from_api(cls, player_names: List[str]) -> None:
+        """
+        WoWS APIから複数プレイヤーのaccount_idをまとめて取得し、キャッシュに格納
+
+        account/list に type=exact でプレイヤー名をカンマ区切りで指定し、1リクエストで取得する。
+        完全一致で見つからなかった名前はキャッシュせず、fetch_account_id_from_apiの個別検索に任せる。
+
+        Args:
+            player_names: プレイヤー名のリスト
+        """
+        missing_names = sorted(
+            {name for name in player_names if _PLAYER_ACCOUNT_CACHE.get(name, _NOT_CACHED) is _NOT_CACHED}
+        )
+
+        for i in range(0, len(missing_names), WOWS_API_MAX_IDS):
+            chunk = missing_names[i : i + WOWS_API_MAX_IDS]
+            try:
+                url = (
+                    f"https://api.worldofwarships.asia/wows/account/list/"
+                    f"?application_id={cls.WOWS_API_APP_ID}&type=exact"
+                    f"&search={','.join(urllib.parse.quote(name) for name in chunk)}"
+                )
+
+                data = _get_json(url)
+
+                if data.get("status") != "ok" or "data" not in data:
+                    logger.warning(f"APIからのアカウントID一括取得エラー ({len(chunk)}件): {data.get('error')}")
+                    continue
+
+                # 完全一致検索は大文字小文字を区別しないため、APIが返す表記と突き合わせる
+                account_ids = {}
+                for player in data["data"] or []:
+                    nickname = player.get("nickname")
+                    if nickname:
+                        account_ids[nickname] = player.get("account_id")
+                        account_ids.setdefault(nickname.lower(), player.get("account_id"))
+
+                found = 0
+                for name in chunk:
+                    account_id = account_ids.get(name, account_ids.get(name.lower()))
+                    if account_id:
+                        _set_cached(_PLAYER_ACCOUNT_CACHE, name, account_id)
+                        found += 1
+                logger.info("APIからアカウントIDを一括取得: %d/%d件", found, len(chunk))
+
+            except Exception as e:
+                logger.warning(f"APIからのアカウントID一括取得エラー ({len(chunk)}件): {e}")
+
     @classmethod
     def fetch_clan_info_from_api(cls, account_id: int) -> Optional[dict]:
         """
@@ -267,8 +421,9 @@ class ReplayMetadataParser:
             {'clan_id': int, 'tag': str} または None
         """
         # キャッシュから検索
-        if account_id in _CLAN_INFO_CACHE:
-            return _CLAN_INFO_CACHE[account_id]
+        clan_info = _get_cached(_CLAN_INFO_CACHE, account_id)
+        if clan_info is not _NOT_CACHED:
+            return clan_info
 
         try:
             # Step 1: account_idからclan_idを取得
@@ -277,38 +432,106 @@ class ReplayMetadataParser:
                 f"?application_id={cls.WOWS_API_APP_ID}&account_id={account_id}"
             )
 
-            with urllib.request.urlopen(url, timeout=5) as response:
-                data = json.loads(response.read().decode("utf-8"))
+            data = _get_json(url)
 
-                if data.get("status") == "ok" and "data" in data:
-                    account_data = data["data"].get(str(account_id))
-                    if account_data and account_data.get("clan_id"):
-                        clan_id = account_data["clan_id"]
+            # status=error（レート制限など）はキャッシュせず、次回に再取得する
+            if data.get("status") != "ok" or "data" not in data:
+                logger.warning(f"APIからのクラン情報取得エラー (account_id: {account_id}): {data.get('error')}")
+                return None
 
-                        # Step 2: clan_idからtagを取得
-                        clan_url = (
-                            f"https://api.worldofwarships.asia/wows/clans/info/"
-                            f"?application_id={cls.WOWS_API_APP_ID}&clan_id={clan_id}"
-                        )
+            account_data = data["data"].get(str(account_id))
+            if account_data and account_data.get("clan_id"):
+                clan_id = account_data["clan_id"]
 
-                        with urllib.request.urlopen(clan_url, timeout=5) as clan_response:
-                            clan_data = json.loads(clan_response.read().decode("utf-8"))
+                # Step 2: clan_idからtagを取得
+                clan_url = (
+                    f"https://api.worldofwarships.asia/wows/clans/info/"
+                    f"?application_id={cls.WOWS_API_APP_ID}&clan_id={clan_id}"
+                )
 
-                            if clan_data.get("status") == "ok" and "data" in clan_data:
-                                clan_info = clan_data["data"].get(str(clan_id))
-                                if clan_info and "tag" in clan_info:
-                                    tag = clan_info["tag"]
-                                    result = {"clan_id": clan_id, "tag": tag}
-                                    logger.info(f"APIからクラン情報を取得: account_id={account_id} -> [{tag}]")
-                                    _CLAN_INFO_CACHE[account_id] = result
-                                    return result
+                clan_data = _get_json(clan_url)
+
+                if clan_data.get("status") != "ok" or "data" not in clan_data:
+                    logger.warning(
+                        f"APIからのクラン情報取得エラー (account_id: {account_id}): {clan_data.get('error')}"
+                    )
+                    return None
+
+                clan_info = clan_data["data"].get(str(clan_id))
+                if clan_info and "tag" in clan_info:
+                    tag = clan_info["tag"]
+                    result = {"clan_id": clan_id, "tag": tag}
+                    logger.info("APIからクラン情報を取得: account_id=%s -> [%s]", account_id, tag)
+                    _set_cached(_CLAN_INFO_CACHE, account_id, result)
+                    return result
 
         except Exception as e:
+            # 通信エラーは一時的なものとしてキャッシュしない
             logger.warning(f"APIからのクラン情報取得エラー (account_id: {account_id}): {e}")
+            return None
 
-        _CLAN_INFO_CACHE[account_id] = None
+        _set_cached(_CLAN_INFO_CACHE, account_id, None)
         return None
 
+    @classmethod
+    def fetch_clan_infos_from_api(cls, account_ids: List[int]) -> None:
+        """
+        WoWS APIから複数アカウントのクラン情報をまとめて取得し、キャッシュに格納
+
+        accountinfo・infoの各エンドポイントにIDをカンマ区切りで指定し、
+        アカウント数によらず2リクエストで取得する。
+        取得に失敗したアカウントはキャッシュせず、fetch_clan_info_from_apiの個別取得に任せる。
+
+        Args:
+            account_ids: アカウントIDのリスト
+        """
+        missing_ids = sorted({account_id for account_id in account_ids if account_id not in _CLAN_INFO_CACHE})
+
+        for i in range(0, len(missing_ids), WOWS_API_MAX_IDS):
+            chunk = missing_ids[i : i + WOWS_API_MAX_IDS]
+            try:
+                # Step 1: account_idからclan_idを取得
+                url = (
+                    f"https://api.worldofwarships.asia/wows/clans/accountinfo/"
+                    f"?application_id={cls.WOWS_API_APP_ID}&account_id={','.join(map(str, chunk))}"
+                )
+
+                data = _get_json(url)
+
+                if data.get("status") != "ok" or "data" not in data:
+                    continue
+
+                clan_ids = {}
+                for account_id in chunk:
+                    account_data = data["data"].get(str(account_id))
+                    if account_data and account_data.get("clan_id"):
+                        clan_ids[account_id] = account_data["clan_id"]
+                    else:
+                        # クラン未所属
+                        _set_cached(_CLAN_INFO_CACHE, account_id, None)
+
+                if not clan_ids:
+                    continue
+
+                # Step 2: clan_idからtagを取得
+                clan_url = (
+                    f"https://api.worldofwarships.asia/wows/clans/info/"
+                    f"?application_id={cls.WOWS_API_APP_ID}"
+                    f"&clan_id={','.join(map(str, sorted(set(clan_ids.values()))))}"
+                )
+
+                clan_data = _get_json(clan_url)
+
+                if clan_data.get("status") == "ok" and "data" in clan_data:
+                    for account_id, clan_id in clan_ids.items():
+                        clan_info = clan_data["data"].get(str(clan_id))
+                        if clan_info and "tag" in clan_info:
+                            _set_cached(_CLAN_INFO_CACHE, account_id, {"clan_id": clan_id, "tag": clan_info["tag"]})
+                    logger.info("APIからクラン情報を一括取得: %d件", len(clan_ids))
+
+            except Exception as e:
+                logger.warning(f"APIからのクラン情報一括取得エラー ({len(chunk)}件): {e}")
+
     @classmethod
     def get_player_clan_tag(cls, player_name: str) -> Optional[str]:
         """
@@ -349,34 +572,38 @@ class ReplayMetadataParser:
 
         try:
             vehicles = metadata.get("vehicles", [])
+            player_names = [player.get("name", "Unknown") for player in vehicles]
+            ship_ids = [player.get("shipId", 0) for player in vehicles]
 
-            for player in vehicles:
-                ship_id = player.get("shipId", 0)
-                ship_name = cls.get_ship_name(ship_id)
-                player_name = player.get("name", "Unknown")
+            # 艦船名・アカウントID・クラン情報はID/名前の一覧でまとめて取得しておき、ループ内はキャッシュから引く
+            # （一括取得で解決できなかったものだけ個別に取得する）
+            cls.fetch_ship_names_from_api(ship_ids)
+            cls.fetch_account_ids_from_api(player_names)
+            account_ids = [cls.fetch_account_id_from_api(player_name) for player_name in player_names]
+            cls.fetch_clan_infos_from_api([account_id for account_id in account_ids if account_id])
 
-                # クランタグを取得
-                clan_tag = cls.get_player_clan_tag(player_name)
+            # relation（0: 自分, 1: 味方, それ以外: 敵）をそのまま添字にして振り分ける
+            teams = (players_info["own"], players_info["allies"], players_info["enemies"])
 
-                player_data = {
-                    "name": player_name,
-                    "shipId": ship_id,
-                    "shipName": ship_name,
-                    "clanTag": clan_tag,
-                }
+            for player, player_name, ship_id, account_id in zip(vehicles, player_names, ship_ids, account_ids):
+                # クランタグを取得（検索済みのaccount_idを使い、名前からの再検索を省略）
+                clan_info = cls.fetch_clan_info_from_api(account_id) if account_id else None
 
                 relation = player.get("relation", 2)
-
-                if relation == 0:
-                    players_info["own"].append(player_data)
-                elif relation == 1:
-                    players_info["allies"].append(player_data)
-                else:
-                    players_info["enemies"].append(player_data)
+                teams[relation if relation in (0, 1) else 2].append(
+                    {
+                        "name": player_name,
+                        "shipId": ship_id,
+                        "shipName": cls.get_ship_name(ship_id),
+                        "clanTag": clan_info.get("tag") if clan_info else None,
+                    }
+                )
 
             logger.info(
-                f"プレイヤー情報を抽出: 自分={len(players_info['own'])}, "
-                f"味方={len(players_info['allies'])}, 敵={len(players_info['enemies'])}"
+                "プレイヤー情報を抽出: 自分=%d, 味方=%d, 敵=%d",
+                len(players_info["own"]),
+                len(players_info["allies"]),
+                len(players_info["enemies"]),
             )
 
             return players_info
@@ -71,13 +71,18 @@ class ReplayProcessor:
                 timeout=600,
             )
 
-            if result.stdout:
-                logger.info(f"Rust render stdout: {result.stdout[:1000]}")
-            if result.stderr:
-                log_fn = logger.info if result.returncode == 0 else logger.error
-                log_fn(f"Rust render stderr: {result.stderr[:2000]}")
+            # 成功時のツール出力はDEBUGレベルのみ（呼び出しごとの整形とログ転送量を省略）
+            if logger.isEnabledFor(logging.DEBUG):
+                if result.stdout and result.returncode == 0:
+                    logger.debug("Rust render stdout: %s", result.stdout[:1000])
+                if result.stderr and result.returncode == 0:
+                    logger.debug("Rust render stderr: %s", result.stderr[:2000])
 
             if result.returncode != 0:
+                if result.stdout:
+                    logger.error("Rust render stdout: %s", result.stdout[:1000])
+                if result.stderr:
+                    logger.error("Rust render stderr: %s", result.stderr[:2000])
                 logger.error(f"Rust render 失敗 (code={result.returncode})")
                 return False
 
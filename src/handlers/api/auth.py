@@ -9,9 +9,11 @@ import os
 import secrets
 import time
 import urllib.parse
-import urllib.request
 
 import boto3
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 環境変数
 DISCORD_CLIENT_ID = os.environ.get("DISCORD_CLIENT_ID")
@@ -22,6 +24,9 @@ ALLOWED_GUILD_ID = os.environ.get("ALLOWED_GUILD_ID", "")
 ALLOWED_ROLE_IDS = os.environ.get("ALLOWED_ROLE_IDS", "")
 UPLOAD_API_KEY = os.environ.get("UPLOAD_API_KEY", "")
 
+# 許可ロールIDの集合（カンマ区切りの環境変数をコンテナ初期化時に1回だけパース）
+ALLOWED_ROLES = frozenset(r.strip() for r in ALLOWED_ROLE_IDS.split(",") if r.strip())
+
 # DynamoDB
 dynamodb = boto3.resource("dynamodb")
 sessions_table = dynamodb.Table(SESSIONS_TABLE)
@@ -36,6 +41,21 @@ DISCORD_USER_URL = "https://discord.com/api/users/@me"
 DISCORD_GUILDS_URL = "https://discord.com/api/users/@me/guilds"
 DISCORD_GUILD_MEMBER_URL = "https://discord.com/api/users/@me/guilds/{guild_id}/member"
 
+# Discord API呼び出し用HTTPセッション（ウォームコンテナ内でTCP/TLS接続を再利用）
+# リトライ上限に達した場合も最後のレスポンスを返し、raise_for_statusでエラー処理する
+_http_session = requests.Session()
+_http_session.headers["User-Agent"] = "wows-replay/1.0"
+_http_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=4,
+        max_retries=Retry(
+            total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False
+        ),
+    ),
+)
+
 
 def get_redirect_uri():
     """リダイレクトURIを取得"""
@@ -219,21 +239,13 @@ def handle_discord_callback(event, context):
             "redirect_uri": get_redirect_uri(),
         }
 
-        req = urllib.request.Request(
-            DISCORD_TOKEN_URL,
-            data=urllib.parse.urlencode(token_data).encode(),
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded",
-                "User-Agent": "wows-replay/1.0",
-            },
-        )
-
         try:
-            with urllib.request.urlopen(req) as response:
-                token_response = json.loads(response.read().decode())
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode() if e.fp else ""
-            print(f"Token exchange error: {e.code} - {error_body}")
+            # dataに辞書を渡すとform-urlencodedで送信される
+            response = _http_session.post(DISCORD_TOKEN_URL, data=token_data, timeout=10)
+            response.raise_for_status()
+            token_response = response.json()
+        except requests.HTTPError as e:
+            print(f"Token exchange error: {e.response.status_code} - {e.response.text}")
             return {
                 "statusCode": 302,
                 "headers": {
@@ -255,18 +267,13 @@ def handle_discord_callback(event, context):
             }
 
         # ユーザー情報取得
-        user_req = urllib.request.Request(
-            DISCORD_USER_URL,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "User-Agent": "wows-replay/1.0",
-            },
-        )
+        auth_headers = {"Authorization": f"Bearer {access_token}"}
 
         try:
-            with urllib.request.urlopen(user_req) as response:
-                user_data = json.loads(response.read().decode())
-        except urllib.error.HTTPError as e:
+            response = _http_session.get(DISCORD_USER_URL, headers=auth_headers, timeout=10)
+            response.raise_for_status()
+            user_data = response.json()
+        except requests.HTTPError as e:
             print(f"User info error: {e}")
             return {
                 "statusCode": 302,
@@ -279,18 +286,11 @@ def handle_discord_callback(event, context):
 
         # ギルドメンバーシップ確認
         if ALLOWED_GUILD_ID:
-            guilds_req = urllib.request.Request(
-                DISCORD_GUILDS_URL,
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "User-Agent": "wows-replay/1.0",
-                },
-            )
-
             try:
-                with urllib.request.urlopen(guilds_req) as response:
-                    guilds_data = json.loads(response.read().decode())
-            except urllib.error.HTTPError as e:
+                response = _http_session.get(DISCORD_GUILDS_URL, headers=auth_headers, timeout=10)
+                response.raise_for_status()
+                guilds_data = response.json()
+            except requests.HTTPError as e:
                 print(f"Guilds info error: {e}")
                 return {
                     "statusCode": 302,
@@ -302,7 +302,8 @@ def handle_discord_callback(event, context):
                 }
 
             # 許可されたギルドのメンバーかチェック
-            is_member = any(guild.get("id") == ALLOWED_GUILD_ID for guild in guilds_data)
+            guild_ids = {guild.get("id") for guild in guilds_data}
+            is_member = ALLOWED_GUILD_ID in guild_ids
 
             if not is_member:
                 print(f"User {user_data.get('id')} is not a member of guild {ALLOWED_GUILD_ID}")
@@ -317,23 +318,16 @@ def handle_discord_callback(event, context):
 
             # ロールチェック
             if ALLOWED_ROLE_IDS:
-                allowed_roles = [r.strip() for r in ALLOWED_ROLE_IDS.split(",") if r.strip()]
+                allowed_roles = ALLOWED_ROLES
 
                 if allowed_roles:
                     # ギルドメンバー情報を取得してロールを確認
                     member_url = DISCORD_GUILD_MEMBER_URL.format(guild_id=ALLOWED_GUILD_ID)
-                    member_req = urllib.request.Request(
-                        member_url,
-                        headers={
-                            "Authorization": f"Bearer {access_token}",
-                            "User-Agent": "wows-replay/1.0",
-                        },
-                    )
-
                     try:
-                        with urllib.request.urlopen(member_req) as response:
-                            member_data = json.loads(response.read().decode())
-                    except urllib.error.HTTPError as e:
+                        response = _http_session.get(member_url, headers=auth_headers, timeout=10)
+                        response.raise_for_status()
+                        member_data = response.json()
+                    except requests.HTTPError as e:
                         print(f"Guild member info error: {e}")
                         return {
                             "statusCode": 302,
@@ -349,12 +343,12 @@ def handle_discord_callback(event, context):
                     print(f"User {user_data.get('id')} roles: {user_roles}")
 
                     # 許可されたロールを持っているかチェック
-                    has_allowed_role = any(role in allowed_roles for role in user_roles)
+                    has_allowed_role = not allowed_roles.isdisjoint(user_roles)
 
                     if not has_allowed_role:
                         print(
                             f"User {user_data.get('id')} does not have any allowed roles. "
-                            f"User roles: {user_roles}, Allowed: {allowed_roles}"
+                            f"User roles: {user_roles}, Allowed: {sorted(allowed_roles)}"
                         )
                         return {
                             "statusCode": 302,
@@ -8,11 +8,14 @@ import json
 import os
 import boto3
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
 from core.replay_processor import ReplayProcessor
 from utils import dynamodb
-from utils.discord_notify import send_replay_notification
 
 # 環境変数
 REPLAYS_BUCKET = os.environ.get("REPLAYS_BUCKET", "wows-replay-bot-dev-temp")
@@ -20,7 +23,31 @@ DISCORD_BOT_TOKEN = os.environ.get("DISCORD_BOT_TOKEN", "")
 NOTIFICATION_CHANNEL_ID = os.environ.get("NOTIFICATION_CHANNEL_ID", "")
 
 # S3クライアント
-s3_client = boto3.client("s3")
+# マルチパート転送（max_concurrency=8）が接続プールで詰まらないよう上限を広げ、
+# ウォーム呼び出し間でTCP接続を維持する
+s3_client = boto3.client(
+    "s3",
+    config=Config(
+        tcp_keepalive=True,
+        max_pool_connections=32,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        connect_timeout=3,
+        read_timeout=30,
+    ),
+)
+
+# Discord通知をS3/DynamoDB処理と並行実行するためのスレッドプール（ウォームコンテナで再利用）
+_executor = ThreadPoolExecutor(max_workers=4)
+
+# S3転送設定（8MB超はマルチパート/バイトレンジで並列転送、ファイル全体をメモリに読み込まない）
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    max_io_queue=1000,
+    io_chunksize=1024 * 1024,
+    use_threads=True,
+)
 
 
 def handle(event, context):
@@ -34,6 +61,10 @@ def handle(event, context):
     Returns:
         APIレスポンス
     """
+    # SQSイベント（battle-result-extractorからの動画生成リクエスト）
+    if "Records" in event:
+        return handle_sqs(event, context)
+
     try:
         # CORS headers
         cors_headers = {
@@ -135,6 +166,24 @@ def handle(event, context):
         }
 
 
+def handle_sqs(event, context):
+    """
+    SQSメッセージから動画を生成
+
+    メッセージ本文はAPIリクエストボディと同じ形式（arenaUniqueID, playerID）。
+    サーバーエラーの場合は例外を送出し、SQSの再試行・DLQに委ねる。
+
+    Args:
+        event: SQSイベント
+        context: Lambdaコンテキスト
+    """
+    for sqs_record in event["Records"]:
+        response = handle({"body": sqs_record["body"], "httpMethod": "POST"}, context)
+        if response["statusCode"] >= 500:
+            raise Exception(f"Video generation failed: {response['body']}")
+        print(f"Video generation finished: status={response['statusCode']}")
+
+
 def generate_single_video(arena_unique_id, player_id, record, cors_headers):
     """
     単一のリプレイから動画を生成
@@ -145,9 +194,10 @@ def generate_single_video(arena_unique_id, player_id, record, cors_headers):
 
     with tempfile.NamedTemporaryFile(suffix=".wowsreplay", delete=False) as tmp_replay:
         replay_path = Path(tmp_replay.name)
-        s3_client.download_fileobj(REPLAYS_BUCKET, s3_key, tmp_replay)
 
     try:
+        s3_client.download_file(REPLAYS_BUCKET, s3_key, str(replay_path), Config=S3_TRANSFER_CONFIG)
+
         # 一時出力ディレクトリ
         with tempfile.TemporaryDirectory() as tmp_output_dir:
             output_dir = Path(tmp_output_dir)
@@ -164,13 +214,13 @@ def generate_single_video(arena_unique_id, player_id, record, cors_headers):
             mp4_s3_key = f"videos/{arena_unique_id}/{player_id}/{replay_path.stem}.mp4"
             print(f"Uploading MP4 to s3://{REPLAYS_BUCKET}/{mp4_s3_key}")
 
-            with open(mp4_path, "rb") as f:
-                s3_client.put_object(
-                    Bucket=REPLAYS_BUCKET,
-                    Key=mp4_s3_key,
-                    Body=f.read(),
-                    ContentType="video/mp4",
-                )
+            s3_client.upload_file(
+                str(mp4_path),
+                REPLAYS_BUCKET,
+                mp4_s3_key,
+                ExtraArgs={"ContentType": "video/mp4"},
+                Config=S3_TRANSFER_CONFIG,
+            )
 
             # DynamoDBを更新
             dynamodb.update_video_info(
@@ -179,23 +229,37 @@ def generate_single_video(arena_unique_id, player_id, record, cors_headers):
                 mp4_s3_key=mp4_s3_key,
             )
 
-            # 署名付きURLを生成
-            presigned_url = s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": REPLAYS_BUCKET, "Key": mp4_s3_key},
-                ExpiresIn=86400,
-            )
-
             # Discord通知を送信（クラン戦のみ）
-            if NOTIFICATION_CHANNEL_ID and DISCORD_BOT_TOKEN:
-                updated_record = dynamodb.get_replay_record(str(arena_unique_id), int(player_id))
-                if updated_record and updated_record.get("gameType") == "clan":
-                    send_replay_notification(
-                        channel_id=NOTIFICATION_CHANNEL_ID,
-                        bot_token=DISCORD_BOT_TOKEN,
-                        record=updated_record,
-                        mp4_url=presigned_url,
-                    )
+            # DynamoDB更新後に送信する（更新前の失敗によるSQS再試行で二重通知しないため）
+            # 通知はローカルのMP4を添付するため、署名付きURL生成と並行して送信する
+            notify_future = None
+            if NOTIFICATION_CHANNEL_ID and DISCORD_BOT_TOKEN and record.get("gameType") == "clan":
+                # 通知モジュール（requests・マップ設定読み込み）は通知時のみ読み込む
+                from utils.discord_notify import send_replay_notification
+
+                notify_future = _executor.submit(
+                    send_replay_notification,
+                    channel_id=NOTIFICATION_CHANNEL_ID,
+                    bot_token=DISCORD_BOT_TOKEN,
+                    record=record,
+                    mp4_path=mp4_path,
+                )
+
+            try:
+                # 署名付きURLを生成
+                presigned_url = s3_client.generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": REPLAYS_BUCKET, "Key": mp4_s3_key},
+                    ExpiresIn=86400,
+                )
+            finally:
+                # 一時ディレクトリ削除前に通知の送信完了を待つ
+                # 動画は保存済みのため、通知の失敗でエラー応答（SQS再試行）にしない
+                if notify_future:
+                    try:
+                        notify_future.result()
+                    except Exception as e:
+                        print(f"Failed to send Discord notification: {e}")
 
             return {
                 "statusCode": 200,
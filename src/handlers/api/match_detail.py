@@ -8,12 +8,12 @@
 
 import json
 from datetime import datetime
-from decimal import Decimal
 
 from utils.dynamodb_tables import (
     BattleTableClient,
     find_match_game_type,
 )
+from utils.json_body import dumps_body
 
 
 def format_uploaded_at(unix_time):
@@ -37,14 +37,57 @@ def format_uploaded_at(unix_time):
     return str(unix_time) if unix_time else None
 
 
-class DecimalEncoder(json.JSONEncoder):
-    """DynamoDB Decimalオブジェクトをシリアライズするカスタムエンコーダー"""
+# 試合詳細レスポンスで参照するMATCHレコードの属性
+_MATCH_FIELDS = (
+    "dateTime",
+    "unixTime",
+    "mapId",
+    "mapDisplayName",
+    "clientVersion",
+    "winLoss",
+    "allyPerspectivePlayerName",
+    "allies",
+    "enemies",
+    "allyMainClanTag",
+    "enemyMainClanTag",
+    "dualRendererAvailable",
+    "hasGameplayVideo",
+    "commentCount",
+    "mp4S3Key",
+    "mp4GeneratedAt",
+    "dualMp4S3Key",
+    "dualMp4GeneratedAt",
+)
 
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# UPLOADレコードからreplays配列へそのまま引き継ぐ属性
+REPLAY_PASSTHROUGH_FIELDS = (
+    "playerID",
+    "playerName",
+    "team",
+    "uploadedBy",
+    "s3Key",
+    "fileName",
+    "fileSize",
+    "ownPlayer",
+    # ゲームプレイ動画情報
+    "gameplayVideoS3Key",
+    "gameplayVideoSize",
+    # 戦闘統計
+    "damage",
+    "kills",
+    "spottingDamage",
+    "potentialDamage",
+    "receivedDamage",
+    "baseXP",
+    "citadels",
+    "fires",
+    "floods",
+)
 
+# 試合詳細レスポンスで参照するMATCH/UPLOADレコードの属性
+# STATSレコードのallPlayersStatsなど大きな属性を転送しないようProjectionExpressionで指定する
+# replays配列の引き継ぎ属性から組み立て、レスポンス側に追加した属性が射影から漏れないようにする
+MATCH_DETAIL_ATTRIBUTES = (*_MATCH_FIELDS, *REPLAY_PASSTHROUGH_FIELDS, "uploadedAt", "gameplayVideoUploadedAt")
 
 # CORS headers
 CORS_HEADERS = {
@@ -103,7 +146,7 @@ def handle_match(event, context):
 
         # MATCH + UPLOADSを取得
         battle_client = BattleTableClient(game_type)
-        full_match = battle_client.get_full_match(arena_unique_id)
+        full_match = battle_client.get_full_match(arena_unique_id, attributes=MATCH_DETAIL_ATTRIBUTES)
 
         if not full_match or not full_match.get("match"):
             return {
@@ -153,47 +196,28 @@ def handle_match(event, context):
             "replays": [],
         }
 
+        # 動画情報（フロントエンド互換性のためreplaysにも含める、全リプレイで共通）
+        replay_video_info = {
+            "mp4S3Key": mp4_s3_key,
+            "mp4GeneratedAt": mp4_generated_at,
+            "dualMp4S3Key": dual_mp4_s3_key,
+            "dualMp4GeneratedAt": dual_mp4_generated_at,
+            "hasDualReplay": has_dual_replay,
+        }
+
         # UPLOADレコードをreplays配列に変換
         for upload in uploads:
-            match_info["replays"].append(
-                {
-                    "arenaUniqueID": arena_unique_id,
-                    "playerID": upload.get("playerID"),
-                    "playerName": upload.get("playerName"),
-                    "team": upload.get("team"),
-                    "uploadedBy": upload.get("uploadedBy"),
-                    "uploadedAt": format_uploaded_at(upload.get("uploadedAt")),
-                    "s3Key": upload.get("s3Key"),
-                    "fileName": upload.get("fileName"),
-                    "fileSize": upload.get("fileSize"),
-                    "ownPlayer": upload.get("ownPlayer"),
-                    # 動画情報（フロントエンド互換性のためreplaysにも含める）
-                    "mp4S3Key": mp4_s3_key,
-                    "mp4GeneratedAt": mp4_generated_at,
-                    "dualMp4S3Key": dual_mp4_s3_key,
-                    "dualMp4GeneratedAt": dual_mp4_generated_at,
-                    "hasDualReplay": has_dual_replay,
-                    # ゲームプレイ動画情報
-                    "gameplayVideoS3Key": upload.get("gameplayVideoS3Key"),
-                    "gameplayVideoSize": upload.get("gameplayVideoSize"),
-                    "gameplayVideoUploadedAt": format_uploaded_at(upload.get("gameplayVideoUploadedAt")),
-                    # 戦闘統計
-                    "damage": upload.get("damage"),
-                    "kills": upload.get("kills"),
-                    "spottingDamage": upload.get("spottingDamage"),
-                    "potentialDamage": upload.get("potentialDamage"),
-                    "receivedDamage": upload.get("receivedDamage"),
-                    "baseXP": upload.get("baseXP"),
-                    "citadels": upload.get("citadels"),
-                    "fires": upload.get("fires"),
-                    "floods": upload.get("floods"),
-                }
-            )
+            replay = {key: upload.get(key) for key in REPLAY_PASSTHROUGH_FIELDS}
+            replay["arenaUniqueID"] = arena_unique_id
+            replay["uploadedAt"] = format_uploaded_at(upload.get("uploadedAt"))
+            replay["gameplayVideoUploadedAt"] = format_uploaded_at(upload.get("gameplayVideoUploadedAt"))
+            replay.update(replay_video_info)
+            match_info["replays"].append(replay)
 
         return {
             "statusCode": 200,
             "headers": CORS_HEADERS,
-            "body": json.dumps(match_info, cls=DecimalEncoder),
+            "body": dumps_body(match_info),
         }
 
     except Exception as e:
@@ -256,12 +280,11 @@ def handle_stats(event, context):
         return {
             "statusCode": 200,
             "headers": CORS_HEADERS,
-            "body": json.dumps(
+            "body": dumps_body(
                 {
                     "arenaUniqueID": arena_unique_id,
                     "allPlayersStats": stats.get("allPlayersStats", []),
-                },
-                cls=DecimalEncoder,
+                }
             ),
         }
 
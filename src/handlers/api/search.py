@@ -12,7 +12,6 @@ Web UIからの検索リクエストを処理
 
 import json
 from datetime import datetime, timezone
-from decimal import Decimal
 
 from utils.dynamodb_tables import (
     BattleTableClient,
@@ -20,6 +19,7 @@ from utils.dynamodb_tables import (
     normalize_game_type,
     parse_index_sk,
 )
+from utils.json_body import dumps_body
 
 
 def normalize_ship_name(name: str) -> str:
@@ -40,15 +40,6 @@ def normalize_ship_name(name: str) -> str:
     return name.upper()
 
 
-class DecimalEncoder(json.JSONEncoder):
-    """DynamoDB Decimalオブジェクトをシリアライズするカスタムエンコーダー"""
-
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
-
-
 def search_matches(
     game_type: str = None,
     map_id: str = None,
@@ -201,7 +192,8 @@ def search_matches(
 
             # BatchGetItemでフルレコードを取得してからポストフィルタ
             if arena_ids_to_fetch:
-                full_matches = battle_client.batch_get_matches(arena_ids_to_fetch)
+                # Decimalはレスポンスのシリアライズ時に変換するため、ここでは全体コピーしない
+                full_matches = battle_client.batch_get_matches(arena_ids_to_fetch, convert_decimals=False)
 
                 for arena_id in arena_ids_to_fetch:
                     match = full_matches.get(arena_id)
@@ -393,14 +385,13 @@ def handle(event, context):
         return {
             "statusCode": 200,
             "headers": cors_headers,
-            "body": json.dumps(
+            "body": dumps_body(
                 {
                     "items": result["items"],
                     "cursorUnixTime": result["nextCursor"],
                     "hasMore": result["hasMore"],
                     "count": len(result["items"]),
-                },
-                cls=DecimalEncoder,
+                }
             ),
         }
 
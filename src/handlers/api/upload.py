@@ -6,6 +6,7 @@
 動画のS3キーを受け取り、DynamoDBレコードに保存する
 """
 
+import hmac
 import json
 import os
 import base64
@@ -20,6 +21,8 @@ from utils import dynamodb
 # 環境変数
 REPLAYS_BUCKET = os.environ.get("REPLAYS_BUCKET", "wows-replay-bot-dev-temp")
 UPLOAD_API_KEY = os.environ.get("UPLOAD_API_KEY", "")
+# 検証用のAPI Key（リクエストごとのエンコードを省略するためコンテナ初期化時に1回だけ変換）
+_UPLOAD_API_KEY_BYTES = UPLOAD_API_KEY.encode("utf-8")
 
 # S3クライアント
 s3_client = boto3.client("s3")
@@ -44,7 +47,11 @@ def handle(event, context):
         headers = event.get("headers", {})
         api_key = headers.get("x-api-key") or headers.get("X-Api-Key")
 
-        if not api_key or api_key != UPLOAD_API_KEY:
+        if (
+            not api_key
+            or not _UPLOAD_API_KEY_BYTES
+            or not hmac.compare_digest(api_key.encode("utf-8"), _UPLOAD_API_KEY_BYTES)
+        ):
             return {"statusCode": 401, "body": json.dumps({"error": "Unauthorized"})}
 
         # リクエストボディ解析
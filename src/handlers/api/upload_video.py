@@ -11,6 +11,7 @@
 4. クライアント → /api/upload: リプレイ送信時にvideoS3Keyをヘッダーで渡す
 """
 
+import hmac
 import json
 import logging
 import os
@@ -24,6 +25,8 @@ logger = logging.getLogger(__name__)
 # 環境変数
 REPLAYS_BUCKET = os.environ.get("REPLAYS_BUCKET", "wows-replay-bot-dev-temp")
 UPLOAD_API_KEY = os.environ.get("UPLOAD_API_KEY", "")
+# 検証用のAPI Key（リクエストごとのエンコードを省略するためコンテナ初期化時に1回だけ変換）
+_UPLOAD_API_KEY_BYTES = UPLOAD_API_KEY.encode("utf-8")
 # Presigned URL有効期限（秒）
 PRESIGN_URL_EXPIRY = int(os.environ.get("PRESIGN_URL_EXPIRY", "3600"))
 # パートサイズ（バイト） - 10MB
@@ -42,7 +45,9 @@ s3_client = boto3.client("s3")
 def _verify_api_key(headers: dict) -> bool:
     """API Keyを検証"""
     api_key = headers.get("x-api-key") or headers.get("X-Api-Key")
-    return api_key and api_key == UPLOAD_API_KEY
+    if not api_key or not _UPLOAD_API_KEY_BYTES:
+        return False
+    return hmac.compare_digest(api_key.encode("utf-8"), _UPLOAD_API_KEY_BYTES)
 
 
 def _error_response(status_code: int, message: str):
@@ -8,10 +8,17 @@ Rust wows-replay-toolでリプレイを解析しDynamoDBを更新
 import json
 import boto3
 import tempfile
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
 from urllib.parse import unquote_plus
 
+import orjson
+from botocore.config import Config
+
 from utils import dynamodb
 from utils.dynamodb import calculate_main_clan_tag
 from utils.dynamodb_tables import (
@@ -24,14 +31,117 @@ from utils.match_key import generate_match_key, format_sortable_datetime
 from utils.dual_render import are_opposing_teams
 from utils.rust_replay_tool import (
     extract_replay,
-    build_players_info_from_rust,
-    build_all_players_stats_from_rust,
+    build_player_data_from_rust,
     get_own_player_stats,
 )
 
-# S3クライアント
-s3_client = boto3.client("s3")
-lambda_client = boto3.client("lambda")
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 動画生成キューURL（未設定時はgenerate-video-apiをLambda非同期呼び出し）
+VIDEO_GENERATION_QUEUE_URL = os.environ.get("VIDEO_GENERATION_QUEUE_URL", "")
+
+# AWSクライアント（遅延初期化、ウォームコンテナ内で接続プールを再利用）
+_s3_client = None
+_lambda_client = None
+_sqs_client = None
+# adaptiveリトライでS3のSlowDown（503）やLambdaのスロットリングに追従する
+_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=32,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    connect_timeout=3,
+    read_timeout=30,
+)
+
+# S3削除などの独立したI/Oを並行実行するためのスレッドプール（ウォームコンテナで再利用）
+_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def get_s3_client():
+    """S3クライアントを取得（遅延初期化）"""
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client("s3", config=_CLIENT_CONFIG)
+    return _s3_client
+
+
+def get_lambda_client():
+    """Lambdaクライアントを取得（遅延初期化）"""
+    global _lambda_client
+    if _lambda_client is None:
+        _lambda_client = boto3.client("lambda", config=_CLIENT_CONFIG)
+    return _lambda_client
+
+
+def get_sqs_client():
+    """SQSクライアントを取得（遅延初期化）"""
+    global _sqs_client
+    if _sqs_client is None:
+        _sqs_client = boto3.client("sqs", config=_CLIENT_CONFIG)
+    return _sqs_client
+
+
+# UPLOADレコードに引き継ぐ戦闘統計フィールド
+_UPLOAD_STAT_FIELDS = (
+    "damage",
+    "kills",
+    "spottingDamage",
+    "potentialDamage",
+    "receivedDamage",
+    "baseXP",
+    "experienceEarned",
+    "citadels",
+    "fires",
+    "floods",
+    "damageAP",
+    "damageHE",
+    "damageTorps",
+    "damageFire",
+    "damageFlooding",
+    "hitsAP",
+    "hitsHE",
+)
+
+# 動画生成判定で参照するリプレイレコードの属性（allPlayersStatsなど大きな属性は取得しない）
+_ARENA_CHECK_ATTRIBUTES = ("playerID", "ownPlayer", "enemies", "mp4S3Key", "dualMp4S3Key")
+
+
+def _normalize_own_player(record: dict) -> dict:
+    """
+    ownPlayerを単一オブジェクトとして取得（旧データの配列形式にも対応）
+
+    Args:
+        record: リプレイレコード
+
+    Returns:
+        ownPlayer (dict)
+    """
+    own_player = record.get("ownPlayer", {})
+    if isinstance(own_player, list):
+        own_player = own_player[0] if own_player else {}
+    return own_player
+
+
+def _format_team_players(players: list) -> list:
+    """
+    MATCHレコード用にallies/enemiesのプレイヤー情報を整形
+
+    Args:
+        players: プレイヤー情報のリスト
+
+    Returns:
+        name/clanTag/shipName/shipIdのみを持つプレイヤー情報のリスト
+    """
+    return [
+        {
+            "name": player.get("name", ""),
+            "clanTag": player.get("clanTag", ""),
+            "shipName": player.get("shipName", ""),
+            "shipId": player.get("shipId", 0),
+        }
+        for player in players
+    ]
 
 
 def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
@@ -55,55 +165,35 @@ def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
         battle_client = BattleTableClient(game_type)
 
         # ownPlayer の処理
-        own_player = old_record.get("ownPlayer", {})
-        if isinstance(own_player, list):
-            own_player = own_player[0] if own_player else {}
+        own_player = _normalize_own_player(old_record)
 
         # 既存のMATCHレコードをチェック
         existing_match = battle_client.get_match(arena_unique_id)
 
+        # このプレイヤーのチームを判定
+        # 既存MATCHの場合、ownPlayerの名前が既存のalliesに含まれていればally、そうでなければenemy
+        upload_team = "ally"
         if existing_match:
+            existing_allies = [a.get("name") for a in existing_match.get("allies", [])]
+            upload_team = "ally" if own_player.get("name") in existing_allies else "enemy"
+
             # 既存の試合にアップローダーを追加
             # 既存のアップローダーに含まれていないか確認
             existing_uploaders = existing_match.get("uploaders", [])
             already_uploaded = any(u.get("playerID") == player_id for u in existing_uploaders)
 
             if not already_uploaded:
-                # このプレイヤーのチームを判定
-                # ownPlayerの名前が既存のalliesに含まれていればally、そうでなければenemy
-                existing_allies = [a.get("name") for a in existing_match.get("allies", [])]
-                team = "ally" if own_player.get("name") in existing_allies else "enemy"
-
-                battle_client.add_uploader(arena_unique_id, player_id, player_name, team)
-                print(f"Added uploader to existing MATCH: player {player_id} as {team}")
+                battle_client.add_uploader(arena_unique_id, player_id, player_name, upload_team)
+                logger.info(f"Added uploader to existing MATCH: player {player_id} as {upload_team}")
 
                 # dualRendererAvailableを更新（敵味方両方のリプレイがある場合）
-                if team == "enemy":
+                if upload_team == "enemy":
                     battle_client.update_dual_renderer_available(arena_unique_id, True)
-                    print("Updated dualRendererAvailable to True")
+                    logger.info("Updated dualRendererAvailable to True")
         else:
             # allies/enemies のフォーマット
-            allies = []
-            for player in old_record.get("allies", []):
-                allies.append(
-                    {
-                        "name": player.get("name", ""),
-                        "clanTag": player.get("clanTag", ""),
-                        "shipName": player.get("shipName", ""),
-                        "shipId": player.get("shipId", 0),
-                    }
-                )
-
-            enemies = []
-            for player in old_record.get("enemies", []):
-                enemies.append(
-                    {
-                        "name": player.get("name", ""),
-                        "clanTag": player.get("clanTag", ""),
-                        "shipName": player.get("shipName", ""),
-                        "shipId": player.get("shipId", 0),
-                    }
-                )
+            allies = _format_team_players(old_record.get("allies", []))
+            enemies = _format_team_players(old_record.get("enemies", []))
 
             # MATCH レコードを作成
             match_record = {
@@ -135,33 +225,24 @@ def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
                 ],
             }
             battle_client.put_match(match_record)
-            print(f"Saved MATCH record to {game_type} table")
+            logger.info(f"Saved MATCH record to {game_type} table")
 
             # STATS レコードを保存（新規MATCHの場合のみ）
             if all_players_stats:
                 battle_client.put_stats(arena_unique_id, all_players_stats)
-                print(f"Saved STATS record with {len(all_players_stats)} players")
+                logger.info(f"Saved STATS record with {len(all_players_stats)} players")
 
             # インデックステーブルを更新（新規MATCHの場合のみ）
             index_client = IndexTableClient()
 
-            # Ship index
-            ship_counts = {}
-            for player in allies + [own_player]:
-                ship_name = player.get("shipName", "")
-                if ship_name:
-                    ship_name_upper = ship_name.upper()
-                    if ship_name_upper not in ship_counts:
-                        ship_counts[ship_name_upper] = {"ally": 0, "enemy": 0}
-                    ship_counts[ship_name_upper]["ally"] += 1
-
-            for player in enemies:
-                ship_name = player.get("shipName", "")
-                if ship_name:
-                    ship_name_upper = ship_name.upper()
-                    if ship_name_upper not in ship_counts:
-                        ship_counts[ship_name_upper] = {"ally": 0, "enemy": 0}
-                    ship_counts[ship_name_upper]["enemy"] += 1
+            # Ship index（味方/敵ごとに1パスで集計）
+            ally_players = allies + [own_player]
+            ally_ships = Counter(p["shipName"].upper() for p in ally_players if p.get("shipName"))
+            enemy_ships = Counter(p["shipName"].upper() for p in enemies if p.get("shipName"))
+            ship_counts = {
+                ship_name: {"ally": ally_ships[ship_name], "enemy": enemy_ships[ship_name]}
+                for ship_name in dict.fromkeys([*ally_ships, *enemy_ships])
+            }
 
             for ship_name, counts in ship_counts.items():
                 index_client.put_ship_index(
@@ -172,11 +253,10 @@ def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
                     ally_count=counts["ally"],
                     enemy_count=counts["enemy"],
                 )
-            print(f"Saved {len(ship_counts)} ship index entries")
 
             # Player index
             player_count = 0
-            for player in allies + [own_player]:
+            for player in ally_players:
                 p_name = player.get("name", "")
                 if p_name:
                     index_client.put_player_index(
@@ -203,26 +283,17 @@ def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
                         ship_name=player.get("shipName", ""),
                     )
                     player_count += 1
-            print(f"Saved {player_count} player index entries")
 
-            # Clan index
-            clan_counts = {}
+            # Clan index（味方/敵ごとに1パスで集計）
             ally_main_clan = old_record.get("allyMainClanTag", "")
             enemy_main_clan = old_record.get("enemyMainClanTag", "")
 
-            for player in allies + [own_player]:
-                clan_tag = player.get("clanTag", "")
-                if clan_tag:
-                    if clan_tag not in clan_counts:
-                        clan_counts[clan_tag] = {"ally": 0, "enemy": 0}
-                    clan_counts[clan_tag]["ally"] += 1
-
-            for player in enemies:
-                clan_tag = player.get("clanTag", "")
-                if clan_tag:
-                    if clan_tag not in clan_counts:
-                        clan_counts[clan_tag] = {"ally": 0, "enemy": 0}
-                    clan_counts[clan_tag]["enemy"] += 1
+            ally_clans = Counter(p["clanTag"] for p in ally_players if p.get("clanTag"))
+            enemy_clans = Counter(p["clanTag"] for p in enemies if p.get("clanTag"))
+            clan_counts = {
+                clan_tag: {"ally": ally_clans[clan_tag], "enemy": enemy_clans[clan_tag]}
+                for clan_tag in dict.fromkeys([*ally_clans, *enemy_clans])
+            }
 
             for clan_tag, counts in clan_counts.items():
                 is_main = clan_tag in [ally_main_clan, enemy_main_clan]
@@ -236,15 +307,11 @@ def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
                     member_count=counts["ally"] + counts["enemy"],
                     is_main_clan=is_main,
                 )
-            print(f"Saved {len(clan_counts)} clan index entries")
+            logger.info(
+                f"Saved index entries: ships={len(ship_counts)}, players={player_count}, clans={len(clan_counts)}"
+            )
 
         # UPLOAD レコードを保存（新規・既存どちらの場合も）
-        # 既存MATCHの場合、このプレイヤーのチームを判定
-        upload_team = "ally"
-        if existing_match:
-            existing_allies = [a.get("name") for a in existing_match.get("allies", [])]
-            upload_team = "ally" if own_player.get("name") in existing_allies else "enemy"
-
         upload_record = {
             "arenaUniqueID": arena_unique_id,
             "playerID": player_id,
@@ -261,33 +328,14 @@ def save_to_new_tables(old_record: dict, all_players_stats: list) -> None:
                 "shipName": own_player.get("shipName", ""),
                 "shipId": own_player.get("shipId", 0),
             },
-            # 戦闘統計
-            "damage": old_record.get("damage", 0),
-            "kills": old_record.get("kills", 0),
-            "spottingDamage": old_record.get("spottingDamage", 0),
-            "potentialDamage": old_record.get("potentialDamage", 0),
-            "receivedDamage": old_record.get("receivedDamage", 0),
-            "baseXP": old_record.get("baseXP", 0),
-            "experienceEarned": old_record.get("experienceEarned", 0),
-            "citadels": old_record.get("citadels", 0),
-            "fires": old_record.get("fires", 0),
-            "floods": old_record.get("floods", 0),
-            "damageAP": old_record.get("damageAP", 0),
-            "damageHE": old_record.get("damageHE", 0),
-            "damageTorps": old_record.get("damageTorps", 0),
-            "damageFire": old_record.get("damageFire", 0),
-            "damageFlooding": old_record.get("damageFlooding", 0),
-            "hitsAP": old_record.get("hitsAP", 0),
-            "hitsHE": old_record.get("hitsHE", 0),
+            # 戦闘統計（未設定の項目は0）
+            **{field: old_record.get(field, 0) for field in _UPLOAD_STAT_FIELDS},
         }
         battle_client.put_upload(upload_record)
-        print(f"Saved UPLOAD record for player {player_id} as {upload_team}")
+        logger.info(f"Saved UPLOAD record for player {player_id} as {upload_team}")
 
     except Exception as e:
-        print(f"Warning: Failed to save to new tables: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.warning(f"Failed to save to new tables: {e}", exc_info=True)
 
 
 def migrate_gameplay_video(
@@ -312,23 +360,22 @@ def migrate_gameplay_video(
         移行が成功した場合True
     """
     bucket = os.environ.get("REPLAYS_BUCKET", "wows-replay-bot-dev-temp")
+    s3_client = get_s3_client()
 
     # 新しい動画S3キー（正式ID）
     new_s3_key = f"gameplay-videos/{arena_unique_id}/{player_id}/capture.mp4"
 
     try:
-        # 元の動画が存在するか確認
+        # 元の動画が存在するか確認（ファイルサイズもここで取得）
         try:
-            s3_client.head_object(Bucket=bucket, Key=pending_video_s3_key)
+            head_response = s3_client.head_object(Bucket=bucket, Key=pending_video_s3_key)
         except s3_client.exceptions.ClientError as e:
             if e.response["Error"]["Code"] == "404":
-                print(
-                    f"Warning: Pending video not found at {pending_video_s3_key}. " "Video may have failed to upload."
-                )
+                logger.warning(f"Pending video not found at {pending_video_s3_key}. Video may have failed to upload.")
                 return False
             raise
 
-        print(f"Found gameplay video at {pending_video_s3_key}, migrating to {new_s3_key}")
+        logger.info(f"Found gameplay video at {pending_video_s3_key}, migrating to {new_s3_key}")
 
         # S3オブジェクトをコピー
         s3_client.copy_object(
@@ -338,39 +385,41 @@ def migrate_gameplay_video(
             ContentType="video/mp4",
         )
 
-        # ファイルサイズを取得
-        head_response = s3_client.head_object(Bucket=bucket, Key=new_s3_key)
+        # コピーは同一内容のため、サイズはコピー元のHEADから取得
         file_size = head_response.get("ContentLength", 0)
 
-        # 元のオブジェクトを削除
-        s3_client.delete_object(Bucket=bucket, Key=pending_video_s3_key)
-
-        print(f"Gameplay video migrated: {pending_video_s3_key} -> {new_s3_key}")
-
-        # DynamoDBを更新
-        import time
+        # 元のオブジェクトの削除はDynamoDB更新と並行して実行
+        delete_future = _executor.submit(s3_client.delete_object, Bucket=bucket, Key=pending_video_s3_key)
 
-        battle_client = BattleTableClient(game_type)
-        uploaded_at = int(time.time())
-
-        battle_client.update_gameplay_video_info(
-            arena_unique_id=arena_unique_id,
-            player_id=player_id,
-            gameplay_video_s3_key=new_s3_key,
-            file_size=file_size,
-            uploaded_at=uploaded_at,
-        )
+        try:
+            # DynamoDBを更新
+            battle_client = BattleTableClient(game_type)
+            uploaded_at = int(time.time())
+
+            battle_client.update_gameplay_video_info(
+                arena_unique_id=arena_unique_id,
+                player_id=player_id,
+                gameplay_video_s3_key=new_s3_key,
+                file_size=file_size,
+                uploaded_at=uploaded_at,
+            )
+
+            battle_client.update_match_has_gameplay_video(arena_unique_id, True)
+            logger.info(f"Gameplay video info updated in DynamoDB: {arena_unique_id}/{player_id}")
+        finally:
+            # Lambdaの凍結で削除が取り残されないよう、戻る前に完了を待つ
+            # 削除の失敗は移行結果に影響しないため、警告のみ出力する
+            try:
+                delete_future.result()
+            except Exception as e:
+                logger.warning(f"Failed to delete pending gameplay video {pending_video_s3_key}: {e}")
 
-        battle_client.update_match_has_gameplay_video(arena_unique_id, True)
-        print(f"Gameplay video info updated in DynamoDB: {arena_unique_id}/{player_id}")
+        logger.info(f"Gameplay video migrated: {pending_video_s3_key} -> {new_s3_key}")
 
         return True
 
     except Exception as e:
-        print(f"Warning: Failed to migrate gameplay video: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.warning(f"Failed to migrate gameplay video: {e}", exc_info=True)
         return False
 
 
@@ -394,12 +443,11 @@ def process_replay_with_rust(tmp_path: str, key: str) -> dict:
     if not arena_unique_id:
         raise ValueError(f"No arenaUniqueID in Rust output for {key}")
 
-    players_info = build_players_info_from_rust(rust_output)
-    own_stats = get_own_player_stats(rust_output)
-    all_players_stats = build_all_players_stats_from_rust(rust_output)
+    players_info, all_players_stats = build_player_data_from_rust(rust_output)
+    own_stats = get_own_player_stats(rust_output, all_players_stats)
 
     skills_count = sum(1 for p in all_players_stats if p.get("captainSkills"))
-    print(
+    logger.info(
         f"Rust extraction: arena={arena_unique_id}, "
         f"win={rust_output.get('winLoss')}, exp={rust_output.get('experienceEarned')}, "
         f"players={len(all_players_stats)}, skills={skills_count}"
@@ -435,38 +483,40 @@ def handle(event, context):
             bucket = record["s3"]["bucket"]["name"]
             key = unquote_plus(record["s3"]["object"]["key"])  # URLデコード
 
-            print(f"Processing: s3://{bucket}/{key}")
+            logger.info(f"Processing: s3://{bucket}/{key}")
 
             # .wowsreplayファイルのみ処理
             if not key.endswith(".wowsreplay"):
-                print(f"Skipping non-replay file: {key}")
+                logger.info(f"Skipping non-replay file: {key}")
+                continue
+
+            # S3キーからtemp_arena_idとplayerIDを抽出
+            # S3キー形式: replays/{temp_arena_id}/{playerID}/{filename}
+            # 処理できないキーはダウンロード前に除外する
+            key_parts = key.split("/")
+            if len(key_parts) >= 3:
+                temp_arena_id = key_parts[1]
+                try:
+                    player_id = int(key_parts[2])
+                except ValueError:
+                    logger.warning(f"Failed to extract playerID from key: {key}")
+                    continue
+            else:
+                logger.warning(f"Invalid S3 key format: {key}")
                 continue
 
             # S3からファイルをダウンロード
             tmp_path = None
             with tempfile.NamedTemporaryFile(suffix=".wowsreplay", delete=False) as tmp_file:
                 tmp_path = Path(tmp_file.name)
-                s3_client.download_fileobj(bucket, key, tmp_file)
+                get_s3_client().download_fileobj(bucket, key, tmp_file)
 
             try:
-                # S3キーからtemp_arena_idとplayerIDを抽出
-                # S3キー形式: replays/{temp_arena_id}/{playerID}/{filename}
-                key_parts = key.split("/")
-                if len(key_parts) >= 3:
-                    temp_arena_id = key_parts[1]
-                    try:
-                        player_id = int(key_parts[2])
-                    except ValueError:
-                        print(f"Failed to extract playerID from key: {key}")
-                        continue
-                else:
-                    print(f"Invalid S3 key format: {key}")
-                    continue
-
                 # 一時IDで保存されたレコードを取得
+                # upload APIはS3保存後にレコードを書き込むため、取得はダウンロード後に行う
                 old_record = dynamodb.get_replay_record(temp_arena_id, player_id)
                 if not old_record:
-                    print(f"No record found for temp_arena_id: {temp_arena_id}, player_id: {player_id}")
+                    logger.warning(f"No record found for temp_arena_id: {temp_arena_id}, player_id: {player_id}")
                     continue
 
                 # Rustでリプレイを解析
@@ -480,11 +530,7 @@ def handle(event, context):
                 if extraction.get("map_display_name"):
                     old_record["mapDisplayName"] = extraction["map_display_name"]
 
-                print(f"Arena ID: {arena_unique_id}, Win/Loss: {win_loss}, Exp: {experience_earned}")
-
                 # 正しいarenaUniqueIDで新しいレコードを作成
-                print(f"Migrating record from temp_id {temp_arena_id} to arena_id {arena_unique_id}")
-
                 # 既存データに勝敗情報を追加
                 old_record["arenaUniqueID"] = str(arena_unique_id)
                 old_record["winLoss"] = win_loss
@@ -501,38 +547,31 @@ def handle(event, context):
                 if players_info.get("enemies"):
                     old_record["enemies"] = players_info["enemies"]
 
+                # ownPlayerは単一オブジェクトとして保存する（旧データの配列形式を読み出し側で変換しない）
+                old_record["ownPlayer"] = _normalize_own_player(old_record)
+
                 # クラン戦の場合、クランタグを計算
                 game_type = old_record.get("gameType", "")
                 if game_type == "clan":
-                    own_player = old_record.get("ownPlayer", {})
-                    if isinstance(own_player, list):
-                        own_player = own_player[0] if own_player else {}
+                    own_player = _normalize_own_player(old_record)
                     ally_players = (
                         [own_player] + old_record.get("allies", []) if own_player else old_record.get("allies", [])
                     )
                     old_record["allyMainClanTag"] = calculate_main_clan_tag(ally_players)
                     old_record["enemyMainClanTag"] = calculate_main_clan_tag(old_record.get("enemies", []))
-                    print(
-                        f"Calculated clan tags: ally={old_record.get('allyMainClanTag')}, "
-                        f"enemy={old_record.get('enemyMainClanTag')}"
-                    )
 
                 # 統計情報をレコードに追加
                 if own_stats:
                     old_record.update(own_stats)
-                    print(f"Added battle stats: damage={own_stats.get('damage')}, kills={own_stats.get('kills')}")
 
                 if all_players_stats:
                     old_record["allPlayersStats"] = all_players_stats
-                    skills_count = sum(1 for p in all_players_stats if p.get("captainSkills"))
-                    print(f"Added all players stats: {len(all_players_stats)} players, {skills_count} with skills")
 
                 # 検索最適化用フィールドを事前計算
                 # matchKey: 試合グループ化に使用（検索時の計算を省略）
                 # dateTimeSortable: ソート可能な日時形式（YYYYMMDDHHMMSS）
                 old_record["matchKey"] = generate_match_key(old_record)
                 old_record["dateTimeSortable"] = format_sortable_datetime(old_record.get("dateTime", ""))
-                print("Added search optimization fields: matchKey, dateTimeSortable")
 
                 # 新しいレコードを作成
                 dynamodb_table = dynamodb.get_table()
@@ -541,12 +580,16 @@ def handle(event, context):
                 # 古いレコード（一時ID）を削除
                 dynamodb_table.delete_item(Key={"arenaUniqueID": temp_arena_id, "playerID": player_id})
 
-                print(f"Successfully migrated and updated record: arena {arena_unique_id}, player {player_id}")
+                logger.info(
+                    f"Migrated record {temp_arena_id} -> {arena_unique_id}: player={player_id}, "
+                    f"win={win_loss}, exp={experience_earned}, "
+                    f"damage={old_record.get('damage')}, kills={old_record.get('kills')}, "
+                    f"clanTags={old_record.get('allyMainClanTag')}/{old_record.get('enemyMainClanTag')}, "
+                    f"matchKey={old_record['matchKey']}"
+                )
 
                 # 艦艇-試合インデックスを作成
-                own_player = old_record.get("ownPlayer", {})
-                if isinstance(own_player, list):
-                    own_player = own_player[0] if own_player else {}
+                own_player = _normalize_own_player(old_record)
 
                 try:
                     dynamodb.put_ship_match_index_entries(
@@ -559,7 +602,7 @@ def handle(event, context):
                         own_player=own_player,
                     )
                 except Exception as ship_idx_err:
-                    print(f"Warning: Failed to create ship index entries: {ship_idx_err}")
+                    logger.warning(f"Failed to create ship index entries: {ship_idx_err}")
 
                 # 新テーブル構造にも保存（移行期間中は両方に保存）
                 all_players_stats = old_record.get("allPlayersStats", [])
@@ -589,10 +632,7 @@ def handle(event, context):
         }
 
     except Exception as e:
-        print(f"Error in battle_result_extractor_handler: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.error(f"Error in battle_result_extractor_handler: {e}", exc_info=True)
 
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
 
@@ -609,92 +649,84 @@ def check_and_trigger_video_generation(arena_unique_id: int, player_id: int):
         player_id: プレイヤーID
     """
     try:
-        # 現在のレコードを取得
-        current_record = dynamodb.get_replay_record(arena_unique_id, player_id)
+        # 同一arenaUniqueIDの全リプレイを取得（敵味方判定用）
+        same_arena_items = dynamodb.get_replays_for_arena(str(arena_unique_id), attributes=_ARENA_CHECK_ATTRIBUTES)
+        logger.info(f"Checking for existing video in arena {arena_unique_id}: replays={len(same_arena_items)}")
+
+        # 現在のレコードは同一arenaのクエリ結果に含まれるため、GetItemせずに取り出す
+        # ownPlayerは書き込み時に単一オブジェクトへ正規化済みのため、全件の変換は不要
+        # （敵味方判定で参照するownPlayerは現在のレコードのもののみ）
+        player_id = int(player_id)
+        current_record = next((item for item in same_arena_items if item.get("playerID") == player_id), None)
         if not current_record:
-            print(f"No record found for arena {arena_unique_id}, player {player_id}")
+            logger.info(f"No record found for arena {arena_unique_id}, player {player_id}")
             return
 
-        # ownPlayerが配列の場合、単一オブジェクトに変換
-        if "ownPlayer" in current_record and isinstance(current_record["ownPlayer"], list):
-            current_record["ownPlayer"] = current_record["ownPlayer"][0] if current_record["ownPlayer"] else {}
-
-        # 現在の試合のmatch_keyを生成
-        current_match_key = generate_match_key(current_record)
-
-        print(f"Checking for existing video in match: {current_match_key}")
-
-        # 同一arenaUniqueIDの全リプレイを取得（敵味方判定用）
-        same_arena_items = dynamodb.get_replays_for_arena(str(arena_unique_id))
-        print(f"Found {len(same_arena_items)} replays for arena {arena_unique_id}")
-
-        # ownPlayerが配列の場合、単一オブジェクトに変換
-        for item in same_arena_items:
-            if "ownPlayer" in item and isinstance(item["ownPlayer"], list):
-                item["ownPlayer"] = item["ownPlayer"][0] if item["ownPlayer"] else {}
-
         # 敵味方リプレイがあるかチェック
         opposing_replay = None
         for other_replay in same_arena_items:
-            if other_replay.get("playerID") == int(player_id):
+            if other_replay.get("playerID") == player_id:
                 continue  # 自分自身はスキップ
             if are_opposing_teams(current_record, other_replay):
                 opposing_replay = other_replay
                 break
 
         has_dual = opposing_replay is not None
-        print(f"Dual replay available: {has_dual}")
 
         # Dual可能な場合、両方のレコードにhasDualReplayを設定
         if has_dual:
             try:
-                dynamodb.update_has_dual_replay(str(arena_unique_id), int(player_id), True)
-                dynamodb.update_has_dual_replay(
-                    str(arena_unique_id),
-                    int(opposing_replay["playerID"]),
-                    True,
-                )
-                print("Updated hasDualReplay flag for both replays")
+                # 2件の更新は独立しているため並行実行し、往復待ちを重ねる
+                dual_futures = [
+                    _executor.submit(dynamodb.update_has_dual_replay, str(arena_unique_id), int(pid), True)
+                    for pid in (player_id, opposing_replay["playerID"])
+                ]
+                for future in dual_futures:
+                    future.result()
+                logger.info("Updated hasDualReplay flag for both replays")
             except Exception as dual_err:
-                print(f"Warning: Failed to update hasDualReplay: {dual_err}")
+                logger.warning(f"Failed to update hasDualReplay: {dual_err}")
 
         # 既にDual動画があるかチェック
         has_dual_video = any(item.get("dualMp4S3Key") for item in same_arena_items)
         if has_dual_video:
-            print("Match already has dual video, skipping generation")
+            logger.info("Match already has dual video, skipping generation")
             return
 
         # 既に通常動画があるかチェック（Dualがない場合は通常動画でOK）
         has_video = any(item.get("mp4S3Key") for item in same_arena_items)
 
         if has_video and not has_dual:
-            print("Match already has video and no dual available, skipping generation")
+            logger.info("Match already has video and no dual available, skipping generation")
             return
 
         # 動画がない、またはDualが可能になった場合は生成をトリガー
-        print(f"Triggering video generation for arena {arena_unique_id}, player {player_id} (dual={has_dual})")
 
-        # 環境変数から関数名を取得
-        stage = os.environ.get("STAGE", "dev")
-        function_name = f"wows-replay-bot-{stage}-generate-video-api"
+        video_request = {"arenaUniqueID": str(arena_unique_id), "playerID": int(player_id)}
 
-        # Lambda非同期呼び出し
-        payload = {
-            "body": json.dumps({"arenaUniqueID": str(arena_unique_id), "playerID": player_id}),
-            "httpMethod": "POST",
-        }
+        if VIDEO_GENERATION_QUEUE_URL:
+            # SQS経由で動画生成をトリガー（リトライ・DLQはキュー側で処理）
+            get_sqs_client().send_message(
+                QueueUrl=VIDEO_GENERATION_QUEUE_URL,
+                MessageBody=orjson.dumps(video_request).decode("utf-8"),
+            )
+        else:
+            # 環境変数から関数名を取得
+            stage = os.environ.get("STAGE", "dev")
+            function_name = f"wows-replay-bot-{stage}-generate-video-api"
 
-        lambda_client.invoke(
-            FunctionName=function_name,
-            InvocationType="Event",
-            Payload=json.dumps(payload),  # 非同期呼び出し
-        )
+            # Lambda非同期呼び出し
+            # generate_video.handleはdict形式のbodyも受け付けるため、bodyを二重にJSONエンコードしない
+            payload = {"body": video_request, "httpMethod": "POST"}
 
-        print(f"Video generation triggered successfully for arena {arena_unique_id}, player {player_id}")
+            get_lambda_client().invoke(
+                FunctionName=function_name,
+                InvocationType="Event",
+                Payload=orjson.dumps(payload),  # 非同期呼び出し
+            )
+
+        logger.info(f"Video generation triggered for arena {arena_unique_id}, player {player_id} (dual={has_dual})")
 
     except Exception as e:
         # エラーが発生しても、メインの処理は継続させる
-        print(f"Error checking/triggering video generation: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.error(f"Error checking/triggering video generation: {e}", exc_info=True)
@@ -20,7 +20,7 @@ class TestBattleTableClientUpdateCommentCount(unittest.TestCase):
 
     def _make_client(self, game_type="clan"):
         """Create a BattleTableClient with a mocked DynamoDB table."""
-        with patch("utils.dynamodb_tables.boto3"):
+        with patch("utils.dynamodb_tables.get_dynamodb_resource"):
             from utils.dynamodb_tables import BattleTableClient
 
             client = BattleTableClient(game_type)
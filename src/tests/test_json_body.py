@@ -0,0 +1,39 @@
+"""
+Response body serialization tests.
+
+Tests for:
+- dumps_body (Decimal and DynamoDB set types)
+"""
+
+import unittest
+from decimal import Decimal
+
+import orjson
+
+from utils.json_body import dumps_body
+
+
+class TestDumpsBody(unittest.TestCase):
+    """Unit tests for dumps_body"""
+
+    def test_converts_decimals(self):
+        """Integral Decimals become ints and fractional ones become floats."""
+        body = orjson.loads(dumps_body({"damage": Decimal("12345"), "ratio": Decimal("0.5")}))
+
+        self.assertEqual(body, {"damage": 12345, "ratio": 0.5})
+        self.assertIsInstance(body["damage"], int)
+
+    def test_converts_sets_to_lists(self):
+        """DynamoDB string/number sets are serialized as lists."""
+        body = orjson.loads(dumps_body({"tags": {"A"}, "ids": frozenset({Decimal("1")})}))
+
+        self.assertEqual(body, {"tags": ["A"], "ids": [1]})
+
+    def test_rejects_unknown_types(self):
+        """Unsupported types still fail instead of being silently dropped."""
+        with self.assertRaises(TypeError):
+            dumps_body({"value": object()})
+
+
+if __name__ == "__main__":
+    unittest.main()
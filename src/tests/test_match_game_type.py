@@ -0,0 +1,163 @@
+"""
+Match game type lookup tests.
+
+Tests for:
+- _batch_find_match_game_type (BatchGetItem across battle tables, priority order, fallback)
+- find_match_game_type (game type LRU cache)
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from utils import dynamodb_tables
+from utils.dynamodb_tables import get_all_battle_table_names
+
+TABLE_NAMES = get_all_battle_table_names()
+
+
+def _found(*game_types):
+    """Build a BatchGetItem Responses dict where the given game types have a MATCH record."""
+    return {TABLE_NAMES[game_type]: [{"arenaUniqueID": "arena-1"}] for game_type in game_types}
+
+
+class TestBatchFindMatchGameType(unittest.TestCase):
+    """Unit tests for _batch_find_match_game_type"""
+
+    def setUp(self):
+        self.resource = MagicMock()
+        self.batch_get_item = self.resource.meta.client.batch_get_item
+        patcher = patch.object(dynamodb_tables, "get_dynamodb_resource", return_value=self.resource)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_all_tables_in_one_call(self):
+        """All four battle tables are queried in a single BatchGetItem."""
+        self.batch_get_item.return_value = {"Responses": _found("random")}
+
+        result = dynamodb_tables._batch_find_match_game_type("arena-1")
+
+        self.assertEqual(result, "random")
+        self.batch_get_item.assert_called_once()
+        request_items = self.batch_get_item.call_args.kwargs["RequestItems"]
+        self.assertEqual(set(request_items), set(TABLE_NAMES.values()))
+
+    def test_prefers_clan_over_lower_priority_tables(self):
+        """When several tables match, clan > ranked > random > other is respected."""
+        self.batch_get_item.return_value = {"Responses": _found("other", "random", "clan")}
+
+        self.assertEqual(dynamodb_tables._batch_find_match_game_type("arena-1"), "clan")
+
+    def test_prefers_ranked_over_random(self):
+        """ranked wins over random and other."""
+        self.batch_get_item.return_value = {"Responses": _found("other", "random", "ranked")}
+
+        self.assertEqual(dynamodb_tables._batch_find_match_game_type("arena-1"), "ranked")
+
+    def test_returns_none_when_no_table_matches(self):
+        """No MATCH record in any table returns None without probing."""
+        self.batch_get_item.return_value = {"Responses": {}}
+
+        with patch.object(dynamodb_tables, "_probe_match_game_type") as probe:
+            self.assertIsNone(dynamodb_tables._batch_find_match_game_type("arena-1"))
+            probe.assert_not_called()
+
+    def test_retries_unprocessed_keys(self):
+        """UnprocessedKeys are retried and results from all rounds are combined."""
+        unprocessed = {TABLE_NAMES["clan"]: {"Keys": [{"arenaUniqueID": "arena-1", "recordType": "MATCH"}]}}
+        self.batch_get_item.side_effect = [
+            {"Responses": _found("random"), "UnprocessedKeys": unprocessed},
+            {"Responses": _found("clan")},
+        ]
+
+        self.assertEqual(dynamodb_tables._batch_find_match_game_type("arena-1"), "clan")
+        self.assertEqual(self.batch_get_item.call_count, 2)
+        self.assertEqual(self.batch_get_item.call_args.kwargs["RequestItems"], unprocessed)
+
+    def test_probes_when_unprocessed_keys_remain_even_if_lower_priority_matched(self):
+        """Remaining UnprocessedKeys fall back to the per-table probe instead of trusting a partial match."""
+        unprocessed = {TABLE_NAMES["clan"]: {"Keys": [{"arenaUniqueID": "arena-1", "recordType": "MATCH"}]}}
+        self.batch_get_item.return_value = {"Responses": _found("random"), "UnprocessedKeys": unprocessed}
+
+        with patch.object(dynamodb_tables, "_probe_match_game_type", return_value="clan") as probe:
+            result = dynamodb_tables._batch_find_match_game_type("arena-1")
+
+        self.assertEqual(result, "clan")
+        probe.assert_called_once_with("arena-1")
+
+    def test_probes_when_batch_get_item_fails(self):
+        """A BatchGetItem error falls back to the per-table probe."""
+        self.batch_get_item.side_effect = Exception("ResourceNotFoundException")
+
+        with patch.object(dynamodb_tables, "_probe_match_game_type", return_value="other") as probe:
+            result = dynamodb_tables._batch_find_match_game_type("arena-1")
+
+        self.assertEqual(result, "other")
+        probe.assert_called_once_with("arena-1")
+
+
+class TestProbeMatchGameType(unittest.TestCase):
+    """Unit tests for _probe_match_game_type"""
+
+    def test_probes_tables_in_priority_order(self):
+        """Tables are probed clan -> ranked -> random -> other and the first hit wins."""
+        hits = {TABLE_NAMES["ranked"], TABLE_NAMES["random"]}
+        probed = []
+
+        def make_table(table_name):
+            table = MagicMock()
+
+            def get_item(**kwargs):
+                probed.append(table_name)
+                return {"Item": {"arenaUniqueID": "arena-1"}} if table_name in hits else {}
+
+            table.get_item.side_effect = get_item
+            return table
+
+        resource = MagicMock()
+        resource.Table.side_effect = make_table
+
+        with patch.object(dynamodb_tables, "get_dynamodb_resource", return_value=resource):
+            result = dynamodb_tables._probe_match_game_type("arena-1")
+
+        self.assertEqual(result, "ranked")
+        self.assertEqual(probed, [TABLE_NAMES["clan"], TABLE_NAMES["ranked"]])
+
+
+class TestFindMatchGameType(unittest.TestCase):
+    """Unit tests for find_match_game_type caching"""
+
+    def setUp(self):
+        dynamodb_tables._game_type_cache.clear()
+        self.addCleanup(dynamodb_tables._game_type_cache.clear)
+
+    def test_caches_found_game_type(self):
+        """A found game type is cached and the tables are not queried again."""
+        with patch.object(dynamodb_tables, "_batch_find_match_game_type", return_value="clan") as batch:
+            self.assertEqual(dynamodb_tables.find_match_game_type("arena-1"), "clan")
+            self.assertEqual(dynamodb_tables.find_match_game_type("arena-1"), "clan")
+
+        batch.assert_called_once_with("arena-1")
+
+    def test_does_not_cache_missing_match(self):
+        """A missing MATCH record is not cached so a later write can still be found."""
+        with patch.object(dynamodb_tables, "_batch_find_match_game_type", return_value=None) as batch:
+            self.assertIsNone(dynamodb_tables.find_match_game_type("arena-1"))
+            self.assertIsNone(dynamodb_tables.find_match_game_type("arena-1"))
+
+        self.assertEqual(batch.call_count, 2)
+
+    def test_evicts_least_recently_used_entry(self):
+        """Exceeding GAME_TYPE_CACHE_MAX_SIZE drops only the least recently used arena."""
+        with patch.object(dynamodb_tables, "GAME_TYPE_CACHE_MAX_SIZE", 2), patch.object(
+            dynamodb_tables, "_batch_find_match_game_type", return_value="random"
+        ):
+            dynamodb_tables.find_match_game_type("arena-1")
+            dynamodb_tables.find_match_game_type("arena-2")
+            dynamodb_tables.find_match_game_type("arena-1")
+            dynamodb_tables.find_match_game_type("arena-3")
+
+        self.assertEqual(list(dynamodb_tables._game_type_cache), ["arena-1", "arena-3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
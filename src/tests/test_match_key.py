@@ -0,0 +1,43 @@
+"""
+Match key datetime tests.
+
+Tests for:
+- round_datetime_to_5min (rounding, leaving unparseable strings unchanged)
+"""
+
+import unittest
+
+from utils.match_key import round_datetime_to_5min
+
+
+class TestRoundDatetimeTo5Min(unittest.TestCase):
+    """Unit tests for round_datetime_to_5min"""
+
+    def test_rounds_down_to_5_minutes(self):
+        """Minutes are truncated to a multiple of 5 and seconds are zeroed."""
+        self.assertEqual(round_datetime_to_5min("04.01.2026 21:56:55"), "04.01.2026 21:55:00")
+        self.assertEqual(round_datetime_to_5min("04.01.2026 21:04:59"), "04.01.2026 21:00:00")
+
+    def test_pads_unpadded_replay_datetime(self):
+        """Unpadded day/month accepted by strptime are normalized like before."""
+        self.assertEqual(round_datetime_to_5min("4.1.2026 21:56:55"), "04.01.2026 21:55:00")
+
+    def test_returns_other_formats_unchanged(self):
+        """Strings that are not "DD.MM.YYYY HH:MM:SS" are returned as-is, even with colons at 13/16."""
+        for value in (
+            "2026-01-04 21:56:55",
+            "04/01/2026 21:56:55",
+            "04.01.2026 21:56:5x",
+            "32.01.2026 21:56:55",
+            "",
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(round_datetime_to_5min(value), value)
+
+    def test_returns_none_unchanged(self):
+        """None is passed through."""
+        self.assertIsNone(round_datetime_to_5min(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
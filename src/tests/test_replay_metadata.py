@@ -0,0 +1,335 @@
+"""
+Replay metadata WoWS API batching tests.
+
+Tests for:
+- ReplayMetadataParser.fetch_ship_names_from_api (chunking, partial results)
+- ReplayMetadataParser.fetch_clan_infos_from_api (chunking, clanless accounts, failed tag lookups)
+- ReplayMetadataParser.fetch_account_ids_from_api (exact batch search)
+- ReplayMetadataParser.fetch_account_id_from_api (no caching on API errors)
+- ReplayMetadataParser.extract_players_info (request count per replay)
+- _set_cached / _get_cached (LRU eviction)
+"""
+
+import unittest
+import urllib.parse
+from unittest.mock import patch
+
+from core import replay_metadata
+from core.replay_metadata import WOWS_API_MAX_IDS, ReplayMetadataParser
+
+
+def _query(url):
+    """Parse the query string of a WoWS API URL into a flat dict."""
+    return {k: v[0] for k, v in urllib.parse.parse_qs(urllib.parse.urlparse(url).query).items()}
+
+
+def _ids(url, name):
+    """Return the comma-separated ID list of a query parameter as ints."""
+    return [int(i) for i in _query(url)[name].split(",")]
+
+
+class ReplayMetadataCacheTestCase(unittest.TestCase):
+    """Clears the module-level API caches around each test."""
+
+    def setUp(self):
+        for cache in (
+            replay_metadata._SHIP_NAME_CACHE,
+            replay_metadata._PLAYER_ACCOUNT_CACHE,
+            replay_metadata._CLAN_INFO_CACHE,
+        ):
+            cache.clear()
+            self.addCleanup(cache.clear)
+
+
+class TestFetchShipNamesFromApi(ReplayMetadataCacheTestCase):
+    """Unit tests for fetch_ship_names_from_api"""
+
+    def test_chunks_requests_at_max_ids(self):
+        """More than WOWS_API_MAX_IDS ship IDs are split into several requests."""
+        ship_ids = list(range(1, WOWS_API_MAX_IDS + 51))
+        urls = []
+
+        def get_json(url):
+            urls.append(url)
+            return {"status": "ok", "data": {str(i): {"name": f"Ship{i}"} for i in _ids(url, "ship_id")}}
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            ReplayMetadataParser.fetch_ship_names_from_api(ship_ids)
+
+        self.assertEqual([len(_ids(url, "ship_id")) for url in urls], [WOWS_API_MAX_IDS, 50])
+        self.assertEqual(len(replay_metadata._SHIP_NAME_CACHE), len(ship_ids))
+        self.assertEqual(replay_metadata._SHIP_NAME_CACHE[ship_ids[-1]], f"Ship{ship_ids[-1]}")
+
+    def test_skips_cached_and_duplicate_ids(self):
+        """Cached ship IDs are not requested again and duplicates are requested once."""
+        replay_metadata._SHIP_NAME_CACHE[1] = "Cached"
+
+        with patch.object(
+            replay_metadata, "_get_json", return_value={"status": "ok", "data": {"2": {"name": "Ship2"}}}
+        ) as get_json:
+            ReplayMetadataParser.fetch_ship_names_from_api([1, 2, 2])
+
+        get_json.assert_called_once()
+        self.assertEqual(_ids(get_json.call_args.args[0], "ship_id"), [2])
+
+    def test_does_not_request_when_all_cached(self):
+        """No request is made when every ship name is already cached."""
+        replay_metadata._SHIP_NAME_CACHE[1] = "Cached"
+
+        with patch.object(replay_metadata, "_get_json") as get_json:
+            ReplayMetadataParser.fetch_ship_names_from_api([1])
+
+        get_json.assert_not_called()
+
+    def test_leaves_missing_ships_uncached(self):
+        """Ships absent from the response (or null) are left for the single-ID fetcher."""
+        with patch.object(
+            replay_metadata, "_get_json", return_value={"status": "ok", "data": {"1": {"name": "Ship1"}, "2": None}}
+        ):
+            ReplayMetadataParser.fetch_ship_names_from_api([1, 2, 3])
+
+        self.assertEqual(replay_metadata._SHIP_NAME_CACHE, {1: "Ship1"})
+
+    def test_request_error_caches_nothing(self):
+        """A failed request leaves the cache untouched."""
+        with patch.object(replay_metadata, "_get_json", side_effect=Exception("timeout")):
+            ReplayMetadataParser.fetch_ship_names_from_api([1, 2])
+
+        self.assertEqual(replay_metadata._SHIP_NAME_CACHE, {})
+
+
+class TestFetchClanInfosFromApi(ReplayMetadataCacheTestCase):
+    """Unit tests for fetch_clan_infos_from_api"""
+
+    def _stub(self, account_clans, clan_tags, clan_info_status="ok"):
+        """
+        Build a _get_json stub.
+
+        account_clans: account_id -> clan_id (None for clanless)
+        clan_tags: clan_id -> tag (missing clan IDs are absent from the clans/info response)
+        """
+        urls = []
+
+        def get_json(url):
+            urls.append(url)
+            if "/clans/accountinfo/" in url:
+                return {
+                    "status": "ok",
+                    "data": {str(i): {"clan_id": account_clans.get(i)} for i in _ids(url, "account_id")},
+                }
+            if clan_info_status != "ok":
+                return {"status": "error", "error": {"message": "REQUEST_LIMIT_EXCEEDED"}}
+            return {
+                "status": "ok",
+                "data": {str(i): {"tag": clan_tags[i]} for i in _ids(url, "clan_id") if i in clan_tags},
+            }
+
+        return urls, get_json
+
+    def test_caches_clan_tags_and_clanless_accounts(self):
+        """Accounts in a clan get {clan_id, tag}; clanless accounts are cached as None."""
+        urls, get_json = self._stub({1: 100, 2: None, 3: 100}, {100: "TAG"})
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            ReplayMetadataParser.fetch_clan_infos_from_api([1, 2, 3])
+
+        self.assertEqual(
+            replay_metadata._CLAN_INFO_CACHE,
+            {1: {"clan_id": 100, "tag": "TAG"}, 2: None, 3: {"clan_id": 100, "tag": "TAG"}},
+        )
+        # accountinfo 1回 + clans/info 1回（同じクランIDは1回だけ指定）
+        self.assertEqual(len(urls), 2)
+        self.assertEqual(_ids(urls[1], "clan_id"), [100])
+
+    def test_leaves_failed_tag_lookups_uncached(self):
+        """Accounts whose clan is missing from clans/info are left for the single-ID fetcher."""
+        _, get_json = self._stub({1: 100, 2: 200}, {100: "TAG"})
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            ReplayMetadataParser.fetch_clan_infos_from_api([1, 2])
+
+        self.assertEqual(replay_metadata._CLAN_INFO_CACHE, {1: {"clan_id": 100, "tag": "TAG"}})
+
+    def test_leaves_accounts_uncached_when_clan_info_not_ok(self):
+        """A non-ok clans/info response caches only the clanless accounts."""
+        _, get_json = self._stub({1: 100, 2: None}, {100: "TAG"}, clan_info_status="error")
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            ReplayMetadataParser.fetch_clan_infos_from_api([1, 2])
+
+        self.assertEqual(replay_metadata._CLAN_INFO_CACHE, {2: None})
+
+    def test_accountinfo_not_ok_caches_nothing(self):
+        """A non-ok accountinfo response leaves every account uncached."""
+        with patch.object(replay_metadata, "_get_json", return_value={"status": "error"}) as get_json:
+            ReplayMetadataParser.fetch_clan_infos_from_api([1, 2])
+
+        get_json.assert_called_once()
+        self.assertEqual(replay_metadata._CLAN_INFO_CACHE, {})
+
+    def test_chunks_requests_at_max_ids(self):
+        """More than WOWS_API_MAX_IDS accounts are split into several accountinfo requests."""
+        account_ids = list(range(1, WOWS_API_MAX_IDS + 11))
+        urls, get_json = self._stub({i: None for i in account_ids}, {})
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            ReplayMetadataParser.fetch_clan_infos_from_api(account_ids)
+
+        self.assertEqual([len(_ids(url, "account_id")) for url in urls], [WOWS_API_MAX_IDS, 10])
+        self.assertEqual(len(replay_metadata._CLAN_INFO_CACHE), len(account_ids))
+
+    def test_skips_cached_accounts(self):
+        """Cached accounts, including cached None, are not requested again."""
+        replay_metadata._CLAN_INFO_CACHE[1] = None
+
+        with patch.object(replay_metadata, "_get_json") as get_json:
+            ReplayMetadataParser.fetch_clan_infos_from_api([1])
+
+        get_json.assert_not_called()
+
+
+class TestFetchAccountIdsFromApi(ReplayMetadataCacheTestCase):
+    """Unit tests for fetch_account_ids_from_api"""
+
+    def test_batches_names_with_exact_search(self):
+        """Names are sent comma-separated with type=exact and matched case-insensitively."""
+        response = {
+            "status": "ok",
+            "data": [{"nickname": "Alice", "account_id": 1}, {"nickname": "Bob", "account_id": 2}],
+        }
+
+        with patch.object(replay_metadata, "_get_json", return_value=response) as get_json:
+            ReplayMetadataParser.fetch_account_ids_from_api(["Alice", "bob", "Carol", "Alice"])
+
+        get_json.assert_called_once()
+        query = _query(get_json.call_args.args[0])
+        self.assertEqual(query["type"], "exact")
+        self.assertEqual(query["search"].split(","), ["Alice", "Carol", "bob"])
+        # 見つからなかった名前は個別検索に任せるためキャッシュしない
+        self.assertEqual(replay_metadata._PLAYER_ACCOUNT_CACHE, {"Alice": 1, "bob": 2})
+
+    def test_chunks_requests_at_max_ids(self):
+        """More than WOWS_API_MAX_IDS names are split into several requests."""
+        names = [f"player{i:03d}" for i in range(WOWS_API_MAX_IDS + 5)]
+        urls = []
+
+        def get_json(url):
+            urls.append(url)
+            return {"status": "ok", "data": []}
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            ReplayMetadataParser.fetch_account_ids_from_api(names)
+
+        self.assertEqual([len(_query(url)["search"].split(",")) for url in urls], [WOWS_API_MAX_IDS, 5])
+
+    def test_error_status_caches_nothing(self):
+        """A rate-limited (status=error) response leaves every name uncached."""
+        response = {"status": "error", "error": {"message": "REQUEST_LIMIT_EXCEEDED"}}
+
+        with patch.object(replay_metadata, "_get_json", return_value=response):
+            ReplayMetadataParser.fetch_account_ids_from_api(["Alice"])
+
+        self.assertEqual(replay_metadata._PLAYER_ACCOUNT_CACHE, {})
+
+
+class TestSingleFetchersDoNotCacheErrors(ReplayMetadataCacheTestCase):
+    """Single-ID fetchers only cache None for genuine "not found" results"""
+
+    RATE_LIMITED = {"status": "error", "error": {"message": "REQUEST_LIMIT_EXCEEDED"}}
+
+    def test_account_error_status_not_cached(self):
+        """status=error returns None without caching it."""
+        with patch.object(replay_metadata, "_get_json", return_value=self.RATE_LIMITED):
+            self.assertIsNone(ReplayMetadataParser.fetch_account_id_from_api("Alice"))
+
+        self.assertNotIn("Alice", replay_metadata._PLAYER_ACCOUNT_CACHE)
+
+    def test_account_request_error_not_cached(self):
+        """A network error returns None without caching it."""
+        with patch.object(replay_metadata, "_get_json", side_effect=Exception("timeout")):
+            self.assertIsNone(ReplayMetadataParser.fetch_account_id_from_api("Alice"))
+
+        self.assertNotIn("Alice", replay_metadata._PLAYER_ACCOUNT_CACHE)
+
+    def test_account_not_found_cached_as_none(self):
+        """An ok response with no players caches None."""
+        with patch.object(replay_metadata, "_get_json", return_value={"status": "ok", "data": []}):
+            self.assertIsNone(ReplayMetadataParser.fetch_account_id_from_api("Alice"))
+
+        self.assertIn("Alice", replay_metadata._PLAYER_ACCOUNT_CACHE)
+        self.assertIsNone(replay_metadata._PLAYER_ACCOUNT_CACHE["Alice"])
+
+    def test_clan_error_status_not_cached(self):
+        """status=error from clans/info returns None without caching it."""
+        responses = [{"status": "ok", "data": {"1": {"clan_id": 100}}}, self.RATE_LIMITED]
+
+        with patch.object(replay_metadata, "_get_json", side_effect=responses):
+            self.assertIsNone(ReplayMetadataParser.fetch_clan_info_from_api(1))
+
+        self.assertNotIn(1, replay_metadata._CLAN_INFO_CACHE)
+
+
+class TestExtractPlayersInfo(ReplayMetadataCacheTestCase):
+    """Unit tests for extract_players_info"""
+
+    def test_uses_one_request_per_endpoint(self):
+        """A replay resolves ships, accounts and clans with one request per endpoint."""
+        urls = []
+
+        def get_json(url):
+            urls.append(url)
+            query = _query(url)
+            if "/encyclopedia/ships/" in url:
+                return {"status": "ok", "data": {i: {"name": f"Ship{i}"} for i in query["ship_id"].split(",")}}
+            if "/account/list/" in url:
+                names = query["search"].split(",")
+                return {"status": "ok", "data": [{"nickname": n, "account_id": len(n)} for n in names]}
+            if "/clans/accountinfo/" in url:
+                return {"status": "ok", "data": {i: {"clan_id": 7} for i in query["account_id"].split(",")}}
+            return {"status": "ok", "data": {"7": {"tag": "TAG"}}}
+
+        metadata = {
+            "vehicles": [
+                {"shipId": 1, "name": "a", "relation": 0},
+                {"shipId": 2, "name": "bb", "relation": 1},
+                {"shipId": 1, "name": "ccc", "relation": 2},
+            ]
+        }
+
+        with patch.object(replay_metadata, "_get_json", side_effect=get_json):
+            players_info = ReplayMetadataParser.extract_players_info(metadata)
+
+        self.assertEqual(len(urls), 4)
+        self.assertEqual(players_info["own"], [{"name": "a", "shipId": 1, "shipName": "Ship1", "clanTag": "TAG"}])
+        self.assertEqual([p["name"] for p in players_info["allies"]], ["bb"])
+        self.assertEqual([p["shipName"] for p in players_info["enemies"]], ["Ship1"])
+
+
+class TestApiCacheLru(ReplayMetadataCacheTestCase):
+    """Unit tests for the bounded LRU API caches"""
+
+    def test_evicts_least_recently_used_entry(self):
+        """Exceeding API_CACHE_MAX_SIZE drops only the least recently used entry."""
+        cache = replay_metadata._SHIP_NAME_CACHE
+
+        with patch.object(replay_metadata, "API_CACHE_MAX_SIZE", 3):
+            for ship_id in (1, 2, 3):
+                replay_metadata._set_cached(cache, ship_id, f"Ship{ship_id}")
+            self.assertEqual(replay_metadata._get_cached(cache, 1), "Ship1")
+            replay_metadata._set_cached(cache, 4, "Ship4")
+
+        self.assertEqual(list(cache), [3, 1, 4])
+        self.assertIs(replay_metadata._get_cached(cache, 2), replay_metadata._NOT_CACHED)
+
+    def test_cache_hit_skips_api(self):
+        """A cached ship name is returned without calling the API."""
+        replay_metadata._set_cached(replay_metadata._SHIP_NAME_CACHE, 1, "Cached")
+
+        with patch.object(replay_metadata, "_get_json") as get_json:
+            self.assertEqual(ReplayMetadataParser.fetch_ship_name_from_api(1), "Cached")
+
+        get_json.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
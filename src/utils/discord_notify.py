@@ -5,45 +5,95 @@ Auto-uploader経由でアップロードされたリプレイの処理完了時
 Discordへ通知を送信する
 """
 
+import json
 import os
+import orjson
 import requests
-import yaml
+import shutil
+import tempfile
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
 FRONTEND_URL = os.environ.get("FRONTEND_URL")  # serverless.ymlから設定される
 
-# マップ名設定ファイルを読み込み
+# Embedフィールド値の文字数上限（Discord API仕様）
+EMBED_FIELD_VALUE_LIMIT = 1024
+_TRUNCATED_SUFFIX = "…他{count}名"
+
+# Discordの添付ファイルサイズ上限（Boostなしサーバーは10MiB）
+DISCORD_ATTACHMENT_LIMIT = int(os.environ.get("DISCORD_ATTACHMENT_LIMIT", str(10 * 1024 * 1024)))
+
+# 動画ダウンロード時の書き込みチャンクサイズ（1MiB）
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# HTTPセッション（ウォームコンテナ内でTCP/TLS接続を再利用）
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+# マップ名設定ファイル
+# map_names.json はDockerビルド時にmap_names.yamlから生成される（YAMLパースを省略するため）
+# Lambdaイメージでは ${LAMBDA_TASK_ROOT}/config に配置される（ローカルではリポジトリ直下のconfig）
+_LAMBDA_TASK_ROOT = os.environ.get("LAMBDA_TASK_ROOT")
+_CONFIG_DIR = (
+    Path(_LAMBDA_TASK_ROOT) / "config" if _LAMBDA_TASK_ROOT else Path(__file__).parent.parent.parent / "config"
+)
+
+# マップ名設定ファイルを読み込み（コンテナ内で1回のみ）
 _map_config = None
 
 
 def _load_map_config():
-    """マップ名設定を読み込む"""
+    """マップ名設定を読み込む（JSONキャッシュ優先、なければYAML）"""
     global _map_config
     if _map_config is None:
-        config_path = Path(__file__).parent.parent.parent / "config" / "map_names.yaml"
-        if config_path.exists():
-            with open(config_path, "r", encoding="utf-8") as f:
-                _map_config = yaml.safe_load(f)
+        json_path = _CONFIG_DIR / "map_names.json"
+        yaml_path = _CONFIG_DIR / "map_names.yaml"
+        if json_path.exists():
+            with open(json_path, "r", encoding="utf-8") as f:
+                _map_config = json.load(f)
+        elif yaml_path.exists():
+            import yaml
+
+            # libyamlがあればC実装のローダーを使用（純Python版より大幅に高速）
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            with open(yaml_path, "r", encoding="utf-8") as f:
+                _map_config = yaml.load(f, Loader=loader)
         else:
             _map_config = {"maps": {}, "default_map_name": "不明"}
     return _map_config
 
 
+# コンテナ初期化時に読み込み、ウォーム呼び出しではパースしない
+# 通知で使うのはマップ名のみのため、参照先の辞書を直接保持する
+_MAP_NAMES = _load_map_config().get("maps", {})
+_DEFAULT_MAP_NAME = _load_map_config().get("default_map_name")
+
+
 def get_map_name_ja(map_id: str) -> str:
     """マップIDから日本語名を取得"""
-    config = _load_map_config()
-    return config.get("maps", {}).get(map_id, config.get("default_map_name", map_id))
+    return _MAP_NAMES.get(map_id, _DEFAULT_MAP_NAME or map_id)
+
+
+# ゲームタイプの日本語名（呼び出しごとに辞書を組み立てない）
+_GAME_TYPE_NAMES_JA = {
+    "clan": "クラン戦",
+    "pvp": "ランダム戦",
+    "ranked": "ランク戦",
+}
 
 
 def get_game_type_ja(game_type: str) -> str:
     """ゲームタイプの日本語名を取得"""
-    game_type_names = {
-        "clan": "クラン戦",
-        "pvp": "ランダム戦",
-        "ranked": "ランク戦",
-    }
-    return game_type_names.get(game_type, game_type)
+    return _GAME_TYPE_NAMES_JA.get(game_type, game_type)
 
 
 def get_win_loss_ja(win_loss: str) -> str:
@@ -66,6 +116,78 @@ def get_win_loss_color(win_loss: str) -> int:
     return 0x808080  # グレー
 
 
+def _format_member_list(members: list) -> str:
+    """
+    Embedフィールド用にメンバーリストをフォーマット（名前 - 艦艇名）
+
+    Discordのフィールド値上限を超える場合は、超える手前で打ち切って省略表記を付ける。
+
+    Args:
+        members: プレイヤー情報のリスト
+
+    Returns:
+        改行区切りのメンバーリスト文字列
+    """
+    lines = []
+    length = 0
+    for i, member in enumerate(members):
+        line = f"**{member.get('name', 'Unknown')}** - {member.get('shipName', '不明')}"
+        # 改行分を含めた長さで判定
+        length += len(line) + (1 if lines else 0)
+        if length > EMBED_FIELD_VALUE_LIMIT - len(_TRUNCATED_SUFFIX):
+            lines.append(_TRUNCATED_SUFFIX.format(count=len(members) - i))
+            break
+        lines.append(line)
+    return "\n".join(lines) if lines else "なし"
+
+
+def _open_video_file(mp4_path: Path = None, mp4_url: str = None):
+    """
+    添付用の動画ファイルを開く
+
+    ローカルファイルがあればそれを直接開き、S3からの再ダウンロードを省略する。
+    なければPresigned URLから一時ファイルへストリーミングダウンロードする。
+
+    requestsはmultipartボディをメモリ上で組み立てるため、添付上限を超える動画は
+    読み込み前に除外する（Discord側で413になるアップロードを避ける）。
+
+    Args:
+        mp4_path: ローカルのMP4ファイルパス
+        mp4_url: 動画のPresigned URL
+
+    Returns:
+        読み込み位置が先頭のバイナリファイルオブジェクト
+
+    Raises:
+        ValueError: 動画サイズが添付上限を超える場合
+    """
+    if mp4_path and Path(mp4_path).exists():
+        _check_attachment_size(Path(mp4_path).stat().st_size)
+        return open(mp4_path, "rb")
+
+    # レスポンス全体をメモリに保持しない
+    print("Downloading MP4 from presigned URL...")
+    video_file = tempfile.TemporaryFile()
+    try:
+        with _session.get(mp4_url, timeout=60, stream=True) as video_response:
+            video_response.raise_for_status()
+            content_length = video_response.headers.get("Content-Length")
+            if content_length:
+                _check_attachment_size(int(content_length))
+            shutil.copyfileobj(video_response.raw, video_file, length=_DOWNLOAD_CHUNK_SIZE)
+        video_file.seek(0)
+    except Exception:
+        video_file.close()
+        raise
+    return video_file
+
+
+def _check_attachment_size(size: int) -> None:
+    """添付ファイルサイズが上限以内か確認"""
+    if size > DISCORD_ATTACHMENT_LIMIT:
+        raise ValueError(f"MP4 too large to attach: {size:,} bytes (limit {DISCORD_ATTACHMENT_LIMIT:,})")
+
+
 def send_replay_notification(
     channel_id: str,
     bot_token: str,
@@ -73,6 +195,7 @@ def send_replay_notification(
     mp4_url: str = None,
     web_ui_base_url: str = None,
     is_dual: bool = False,
+    mp4_path: Path = None,
 ) -> bool:
     """
     リプレイ処理完了通知を送信
@@ -84,6 +207,7 @@ def send_replay_notification(
         mp4_url: 動画のPresigned URL（オプション）
         web_ui_base_url: Web UIのベースURL
         is_dual: Dual Render動画かどうか
+        mp4_path: ローカルのMP4ファイルパス（指定時はmp4_urlからのダウンロードを省略）
 
     Returns:
         送信成功/失敗
@@ -123,15 +247,6 @@ def send_replay_notification(
         win_loss_ja = get_win_loss_ja(win_loss)
         embed_color = get_win_loss_color(win_loss)
 
-        # メンバーリストをフォーマット（名前 - 艦艇名）
-        def format_member_list(members):
-            lines = []
-            for member in members:
-                name = member.get("name", "Unknown")
-                ship = member.get("shipName", "不明")
-                lines.append(f"**{name}** - {ship}")
-            return "\n".join(lines) if lines else "なし"
-
         own_player_name = own_player.get("name", "")
 
         # 自分を味方リストに含める（alliesに自分が含まれていない場合）
@@ -139,8 +254,8 @@ def send_replay_notification(
         if own_player_name and own_player_name not in ally_names:
             allies = [own_player] + allies
 
-        ally_list = format_member_list(allies)
-        enemy_list = format_member_list(enemies)
+        ally_list = _format_member_list(allies)
+        enemy_list = _format_member_list(enemies)
 
         # クラン対戦テキスト
         clan_text = ""
@@ -194,36 +309,30 @@ def send_replay_notification(
         }
 
         # MP4動画がある場合はファイルとして添付
-        if mp4_url:
+        if mp4_path or mp4_url:
             try:
-                # Presigned URLから動画をダウンロード
-                print("Downloading MP4 from presigned URL...")
-                video_response = requests.get(mp4_url, timeout=60)
-                video_response.raise_for_status()
-
-                # multipart/form-dataでファイルを添付して送信
-                import json
-
-                files = {
-                    "files[0]": (
-                        "minimap.mp4",
-                        video_response.content,
-                        "video/mp4",
-                    ),
-                }
-                data = {
-                    "payload_json": json.dumps({"embeds": embeds}),
-                }
-                response = requests.post(url, headers=headers, files=files, data=data, timeout=120)
+                with _open_video_file(mp4_path, mp4_url) as video_file:
+                    # multipart/form-dataでファイルを添付して送信
+                    files = {
+                        "files[0]": (
+                            "minimap.mp4",
+                            video_file,
+                            "video/mp4",
+                        ),
+                    }
+                    data = {
+                        "payload_json": orjson.dumps({"embeds": embeds}).decode("utf-8"),
+                    }
+                    response = _session.post(url, headers=headers, files=files, data=data, timeout=120)
             except Exception as e:
                 print(f"Failed to attach MP4, sending without video: {e}")
                 # 動画添付に失敗した場合はテキストのみ送信
                 headers["Content-Type"] = "application/json"
-                response = requests.post(url, headers=headers, json={"embeds": embeds}, timeout=30)
+                response = _session.post(url, headers=headers, json={"embeds": embeds}, timeout=30)
         else:
             # 動画なしの場合
             headers["Content-Type"] = "application/json"
-            response = requests.post(url, headers=headers, json={"embeds": embeds}, timeout=30)
+            response = _session.post(url, headers=headers, json={"embeds": embeds}, timeout=30)
 
         response.raise_for_status()
 
@@ -24,12 +24,9 @@ def are_opposing_teams(replay_a: Dict[str, Any], replay_b: Dict[str, Any]) -> bo
     if not player_a_name:
         return False
 
-    # プレイヤーBの敵リストを取得
-    enemies_b = replay_b.get("enemies", [])
-    enemy_names_b = [e.get("name") for e in enemies_b if e.get("name")]
-
     # プレイヤーAがBの敵リストに含まれていれば敵味方関係
-    return player_a_name in enemy_names_b
+    # 名前リストを作らず、一致した時点で打ち切る
+    return any(e.get("name") == player_a_name for e in replay_b.get("enemies", []))
 
 
 def find_opposing_replay_pair(
@@ -6,6 +6,7 @@ Version: 2026-01-06 - Added clan tag calculation support
 
 import os
 import boto3
+from botocore.config import Config
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from collections import Counter
@@ -15,6 +16,9 @@ _dynamodb = None
 REPLAYS_TABLE_NAME = os.environ.get("REPLAYS_TABLE", "wows-replays-dev")
 SHIP_MATCH_INDEX_TABLE_NAME = os.environ.get("SHIP_MATCH_INDEX_TABLE", "wows-ship-match-index-dev")
 
+# get_replays_for_arena のページング上限（暴走防止）
+MAX_ARENA_QUERY_PAGES = 10
+
 
 def get_dynamodb_resource():
     """DynamoDBリソースを取得（遅延初期化）"""
@@ -23,6 +27,7 @@ def get_dynamodb_resource():
         _dynamodb = boto3.resource(
             "dynamodb",
             region_name=os.environ.get("AWS_REGION", "ap-northeast-1"),
+            config=Config(tcp_keepalive=True, max_pool_connections=10),
         )
     return _dynamodb
 
@@ -45,15 +50,8 @@ def calculate_main_clan_tag(players: List[Dict[str, Any]]) -> Optional[str]:
     if not players:
         return None
 
-    # クランタグを持つプレイヤーのみを抽出
-    clan_tags = [p.get("clanTag") for p in players if p.get("clanTag")]
-
-    if not clan_tags:
-        return None
-
-    # 最も多いクランタグを取得
-    counter = Counter(clan_tags)
-    most_common = counter.most_common(1)
+    # クランタグを持つプレイヤーのみを1パスで集計し、最も多いクランタグを取得
+    most_common = Counter(p["clanTag"] for p in players if p.get("clanTag")).most_common(1)
 
     return most_common[0][0] if most_common else None
 
@@ -626,24 +624,43 @@ def search_matches_by_ship_with_count(
 # ====================
 
 
-def get_replays_for_arena(arena_unique_id: str) -> List[Dict[str, Any]]:
+def get_replays_for_arena(arena_unique_id: str, attributes: Optional[tuple] = None) -> List[Dict[str, Any]]:
     """
     同一arenaUniqueIDの全リプレイを取得
 
     Args:
         arena_unique_id: arenaUniqueID
+        attributes: 取得する属性名（指定時はProjectionExpressionでallPlayersStatsなどの転送を省略）
 
     Returns:
         リプレイレコードのリスト
     """
     table = get_table()
 
-    response = table.query(
-        KeyConditionExpression="arenaUniqueID = :aid",
-        ExpressionAttributeValues={":aid": str(arena_unique_id)},
-    )
+    query_params = {
+        "KeyConditionExpression": "arenaUniqueID = :aid",
+        "ExpressionAttributeValues": {":aid": str(arena_unique_id)},
+    }
+    if attributes:
+        # 予約語との衝突を避けるため全属性をプレースホルダー経由で指定
+        names = {f"#p{i}": name for i, name in enumerate(attributes)}
+        query_params["ProjectionExpression"] = ", ".join(names)
+        query_params["ExpressionAttributeNames"] = names
+
+    # 1MBを超えるとLastEvaluatedKeyが返るため、上限ページ数までページングする
+    items = []
+    for _ in range(MAX_ARENA_QUERY_PAGES):
+        response = table.query(**query_params)
+        items.extend(response.get("Items", []))
+
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            break
+        query_params["ExclusiveStartKey"] = last_key
+    else:
+        print(f"Warning: Arena {arena_unique_id} query truncated after {MAX_ARENA_QUERY_PAGES} pages")
 
-    return response.get("Items", [])
+    return items
 
 
 def update_dual_video_info(
@@ -5,12 +5,23 @@ DynamoDB テーブル操作ユーティリティ
 """
 
 import os
+import re
 import time
+from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-import boto3
+from utils.dynamodb import get_dynamodb_resource
+from utils.replay_datetime import parse_replay_datetime
+
+# 一時arenaID（MD5ハッシュの先頭16文字）の判定パターン
+_TEMP_ARENA_ID_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+# arenaUniqueID → gameType のキャッシュ
+# 試合のgameTypeは変わらないため、ウォームコンテナ内では全テーブルの探索を省略できる（上限付きLRU）
+GAME_TYPE_CACHE_MAX_SIZE = 4096
+_game_type_cache: "OrderedDict[str, str]" = OrderedDict()
 
 # gameType の正規化マッピング
 GAME_TYPE_MAP = {
@@ -63,11 +74,8 @@ def parse_datetime_to_unix(date_time_str: str) -> int:
     """
     DD.MM.YYYY HH:MM:SS 形式の日時を Unix timestamp に変換
     """
-    try:
-        dt = datetime.strptime(date_time_str, "%d.%m.%Y %H:%M:%S")
-        return int(dt.timestamp())
-    except ValueError:
-        return int(time.time())
+    dt = parse_replay_datetime(date_time_str)
+    return int(dt.timestamp()) if dt else int(time.time())
 
 
 def unix_to_datetime_str(unix_time: int) -> str:
@@ -137,7 +145,7 @@ class BattleTableClient:
 
     def __init__(self, game_type: str):
         self.game_type = normalize_game_type(game_type)
-        self.dynamodb = boto3.resource("dynamodb")
+        self.dynamodb = get_dynamodb_resource()
         self.table_name = get_battle_table_name(self.game_type)
         self.table = self.dynamodb.Table(self.table_name)
 
@@ -171,16 +179,34 @@ class BattleTableClient:
         items = response.get("Items", [])
         return [decimal_to_python(item) for item in items]
 
-    def get_full_match(self, arena_unique_id: str) -> Optional[dict]:
+    def get_full_match(self, arena_unique_id: str, attributes: tuple = None) -> Optional[dict]:
         """
         試合の全データ（MATCH + STATS + UPLOADS）を取得
+
+        Args:
+            arena_unique_id: アリーナユニークID
+            attributes: 取得する属性名（指定時はProjectionExpressionで転送量を削減）
         """
-        response = self.table.query(
-            KeyConditionExpression="arenaUniqueID = :aid",
-            ExpressionAttributeValues={":aid": arena_unique_id},
-        )
+        query_params = {
+            "KeyConditionExpression": "arenaUniqueID = :aid",
+            "ExpressionAttributeValues": {":aid": arena_unique_id},
+        }
+        if attributes:
+            # 予約語との衝突を避けるため全属性をプレースホルダー経由で指定
+            # recordTypeはレコード種別の判定に必要
+            names = {f"#p{i}": name for i, name in enumerate(("recordType", *attributes))}
+            query_params["ProjectionExpression"] = ", ".join(names)
+            query_params["ExpressionAttributeNames"] = names
+
+        items = []
+        while True:
+            response = self.table.query(**query_params)
+            items.extend(response.get("Items", []))
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            query_params["ExclusiveStartKey"] = last_key
 
-        items = response.get("Items", [])
         if not items:
             return None
 
@@ -348,12 +374,14 @@ class BattleTableClient:
             ExpressionAttributeValues={":has": has_video},
         )
 
-    def batch_get_matches(self, arena_unique_ids: list) -> dict:
+    def batch_get_matches(self, arena_unique_ids: list, convert_decimals: bool = True) -> dict:
         """
         複数のMATCHレコードを一括取得
 
         Args:
             arena_unique_ids: arenaUniqueIDのリスト
+            convert_decimals: Decimalをint/floatに変換するか
+                （レスポンスのシリアライズ時にDecimalを変換する場合はFalseで全体コピーを省略）
 
         Returns:
             {arenaUniqueID: MATCHレコード} の辞書
@@ -376,7 +404,7 @@ class BattleTableClient:
             for item in items:
                 arena_id = item.get("arenaUniqueID")
                 if arena_id:
-                    results[arena_id] = decimal_to_python(item)
+                    results[arena_id] = decimal_to_python(item) if convert_decimals else item
 
             # UnprocessedKeys がある場合は再試行（簡易実装）
             unprocessed = response.get("UnprocessedKeys", {})
@@ -456,7 +484,7 @@ class IndexTableClient:
     """
 
     def __init__(self):
-        self.dynamodb = boto3.resource("dynamodb")
+        self.dynamodb = get_dynamodb_resource()
 
         # テーブル名を環境変数から取得
         self.ship_table = self.dynamodb.Table(os.environ.get("SHIP_INDEX_TABLE", "wows-ship-index-dev"))
@@ -632,12 +660,67 @@ def find_match_game_type(arena_unique_id: str) -> Optional[str]:
     """
     arenaUniqueID から gameType を特定する
 
-    全バトルテーブルを検索して MATCH レコードを探す
+    全バトルテーブルの MATCH レコードを1回の BatchGetItem で探す
+    （一度特定したgameTypeはキャッシュし、同じ試合の再検索では探索しない）
+    """
+    cached = _game_type_cache.get(arena_unique_id)
+    if cached:
+        # 最近参照したものとして末尾に移動
+        _game_type_cache.move_to_end(arena_unique_id)
+        return cached
+
+    game_type = _batch_find_match_game_type(arena_unique_id)
+    if game_type:
+        # 上限を超えた場合は最も古く参照されたものから破棄（LRU）
+        _game_type_cache[arena_unique_id] = game_type
+        while len(_game_type_cache) > GAME_TYPE_CACHE_MAX_SIZE:
+            _game_type_cache.popitem(last=False)
+    return game_type
+
+
+def _batch_find_match_game_type(arena_unique_id: str) -> Optional[str]:
     """
-    dynamodb = boto3.resource("dynamodb")
+    全バトルテーブルに対して MATCH レコードの有無を BatchGetItem で確認する
 
-    for game_type in ["clan", "ranked", "random", "other"]:
-        table_name = get_battle_table_name(game_type)
+    BatchGetItem が失敗した場合（未作成のテーブルがある環境など）はテーブルごとの GetItem で探す
+    """
+    dynamodb = get_dynamodb_resource()
+    table_names = get_all_battle_table_names()
+    key = {"arenaUniqueID": arena_unique_id, "recordType": "MATCH"}
+    request_items = {
+        table_name: {"Keys": [key], "ProjectionExpression": "arenaUniqueID"} for table_name in table_names.values()
+    }
+
+    found_tables = set()
+    try:
+        # UnprocessedKeys はスロットリング時のみ発生するため、数回の再試行で十分
+        for _ in range(3):
+            response = dynamodb.meta.client.batch_get_item(RequestItems=request_items)
+            found_tables.update(table_name for table_name, items in response.get("Responses", {}).items() if items)
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                break
+    except Exception:
+        return _probe_match_game_type(arena_unique_id)
+
+    if request_items:
+        # 未処理のテーブルが残った場合は、優先度の高いテーブルを取りこぼさないよう個別に探す
+        return _probe_match_game_type(arena_unique_id)
+
+    # 複数テーブルに存在する場合は従来の探索順（clan → ranked → random → other）を優先
+    for game_type, table_name in table_names.items():
+        if table_name in found_tables:
+            return game_type
+    return None
+
+
+def _probe_match_game_type(arena_unique_id: str) -> Optional[str]:
+    """
+    バトルテーブルを順に GetItem して MATCH レコードを探す
+    """
+    dynamodb = get_dynamodb_resource()
+
+    for game_type, table_name in get_all_battle_table_names().items():
         table = dynamodb.Table(table_name)
 
         try:
@@ -666,12 +749,10 @@ def is_temp_arena_id(arena_id: str) -> bool:
     Returns:
         一時IDの場合True
     """
-    import re
-
     if not arena_id or len(arena_id) != 16:
         return False
     # 16文字の16進数（小文字）かつ数字のみではない
-    return bool(re.match(r"^[0-9a-f]{16}$", arena_id.lower())) and not arena_id.isdigit()
+    return _TEMP_ARENA_ID_PATTERN.fullmatch(arena_id.lower()) is not None and not arena_id.isdigit()
 
 
 def find_arena_unique_id_by_temp_id(temp_arena_id: str, player_id: int) -> Optional[dict]:
@@ -691,7 +772,7 @@ def find_arena_unique_id_by_temp_id(temp_arena_id: str, player_id: int) -> Optio
         }
         見つからない場合はNone
     """
-    dynamodb = boto3.resource("dynamodb")
+    dynamodb = get_dynamodb_resource()
 
     # wows-replays-{stage}テーブルを検索
     replays_table_name = os.environ.get("REPLAYS_TABLE", "wows-replays-dev")
@@ -0,0 +1,24 @@
+"""
+レスポンスボディ用JSONシリアライズユーティリティ
+
+DynamoDBアイテム（Decimal・セット型を含む）をorjsonでシリアライズする
+"""
+
+from decimal import Decimal
+
+import orjson
+
+
+def decimal_default(obj):
+    """DynamoDB Decimalオブジェクトをシリアライズするorjson用defaultハンドラー"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        # DynamoDBのセット型（SS/NS）
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_body(obj) -> str:
+    """レスポンスボディをorjsonでシリアライズ（stdlib jsonより高速）"""
+    return orjson.dumps(obj, default=decimal_default).decode("utf-8")
@@ -5,9 +5,10 @@
 arenaUniqueIDは各プレイヤーごとに異なるため、プレイヤーセットで識別する
 """
 
-from datetime import datetime
 from functools import lru_cache
 
+from utils.replay_datetime import parse_replay_datetime
+
 
 def format_sortable_datetime(date_str: str) -> str:
     """
@@ -25,11 +26,8 @@ def format_sortable_datetime(date_str: str) -> str:
     if not date_str:
         return "00000000000000"
 
-    try:
-        dt = datetime.strptime(date_str, "%d.%m.%Y %H:%M:%S")
-        return dt.strftime("%Y%m%d%H%M%S")
-    except ValueError:
-        return "00000000000000"
+    dt = parse_replay_datetime(date_str)
+    return dt.strftime("%Y%m%d%H%M%S") if dt else "00000000000000"
 
 
 @lru_cache(maxsize=1024)
@@ -43,20 +41,40 @@ def round_datetime_to_5min(date_time_str):
     Returns:
         5分単位に丸めた日時文字列 (例: "04.01.2026 21:55:00")
     """
-    try:
-        # フォーマット例: "04.01.2026 21:56:55"
-        dt = datetime.strptime(date_time_str, "%d.%m.%Y %H:%M:%S")
-
-        # 分を5分単位に切り捨て
-        rounded_minute = (dt.minute // 5) * 5
-
-        # 丸めた日時を返す
-        rounded_dt = dt.replace(minute=rounded_minute, second=0)
-        return rounded_dt.strftime("%d.%m.%Y %H:%M:00")
-    except Exception as e:
-        print(f"Error rounding datetime: {e}, returning original: {date_time_str}")
+    # フォーマット例: "04.01.2026 21:56:55"
+    # 区切り文字・数値・日付の妥当性はparse_replay_datetimeで検証する（不正な文字列は変換しない）
+    dt = parse_replay_datetime(date_time_str)
+    if dt is None:
+        print(f"Error rounding datetime: invalid format, returning original: {date_time_str}")
         return date_time_str
 
+    # 分を5分単位に切り捨て
+    return f"{dt.day:02d}.{dt.month:02d}.{dt.year:04d} {dt.hour:02d}:{dt.minute // 5 * 5:02d}:00"
+
+
+@lru_cache(maxsize=4096)
+def build_match_key(date_time, map_id, game_type, player_names):
+    """
+    抽出済みの要素からマッチキーを組み立てる
+
+    プレイヤー名のソートもキャッシュ対象に含め、同じ試合の再計算ではソートを省略する
+
+    Args:
+        date_time: "DD.MM.YYYY HH:MM:SS" 形式の日時文字列（丸め前）
+        map_id: マップID
+        game_type: ゲームタイプ
+        player_names: プレイヤー名のfrozenset（順序に依存せずキャッシュがヒットする）
+
+    Returns:
+        マッチキー文字列
+    """
+    # 日時を5分単位に丸める
+    rounded_date_time = round_datetime_to_5min(date_time)
+
+    # プレイヤーリストをソート（安定したキーのため）
+    # フォーマット: "日時(5分丸め)|マップ|ゲームタイプ|プレイヤー1|プレイヤー2|..."
+    return f"{rounded_date_time}|{map_id}|{game_type}|{'|'.join(sorted(player_names))}"
+
 
 def generate_match_key(item):
     """
@@ -76,29 +94,17 @@ def generate_match_key(item):
     if isinstance(own_player, dict) and own_player.get("name"):
         players.add(own_player["name"])
 
-    # alliesを追加
-    for ally in item.get("allies", []):
-        if ally.get("name"):
-            players.add(ally["name"])
-
-    # enemiesを追加
-    for enemy in item.get("enemies", []):
-        if enemy.get("name"):
-            players.add(enemy["name"])
-
-    # プレイヤーリストをソート（安定したキーのため）
-    player_list = sorted(players)
-
-    # 日時を5分単位に丸める
-    date_time = item.get("dateTime", "")
-    rounded_date_time = round_datetime_to_5min(date_time)
-
-    # マップとゲームタイプ
-    map_id = item.get("mapId", "")
-    game_type = item.get("gameType", "")
-
-    # マッチキーを生成
-    # フォーマット: "日時(5分丸め)|マップ|ゲームタイプ|プレイヤー1|プレイヤー2|..."
-    match_key = f"{rounded_date_time}|{map_id}|{game_type}|{'|'.join(player_list)}"
-
-    return match_key
+    # allies/enemiesを追加
+    for team in ("allies", "enemies"):
+        for player in item.get(team, []):
+            name = player.get("name")
+            if name:
+                players.add(name)
+
+    # 保存用のキーは文字列のまま（ソート・連結はキャッシュ内で1回のみ）
+    return build_match_key(
+        item.get("dateTime", ""),
+        item.get("mapId", ""),
+        item.get("gameType", ""),
+        frozenset(players),
+    )
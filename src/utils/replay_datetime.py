@@ -0,0 +1,42 @@
+"""
+リプレイ日時ユーティリティ
+
+リプレイメタデータの日時文字列（"DD.MM.YYYY HH:MM:SS"）を解析する
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+# "DD.MM.YYYY HH:MM:SS" の区切り文字の位置
+_REPLAY_DATETIME_SEPARATORS = ((2, "."), (5, "."), (10, " "), (13, ":"), (16, ":"))
+
+
+@lru_cache(maxsize=1024)
+def parse_replay_datetime(date_str: str) -> Optional[datetime]:
+    """
+    リプレイの日時文字列をdatetimeに変換（同じ文字列の再パースを省略するためキャッシュ）
+
+    同一リプレイの日時はソート用文字列・Unix時間などで繰り返しパースされるため、
+    結果を共有する
+
+    Args:
+        date_str: "DD.MM.YYYY HH:MM:SS" 形式の日時文字列
+
+    Returns:
+        datetime（パース失敗時はNone）
+    """
+    try:
+        # 固定長の "DD.MM.YYYY HH:MM:SS" はスライスで直接変換（strptimeの書式解析・正規表現を省略）
+        if len(date_str) == 19 and all(date_str[i] == sep for i, sep in _REPLAY_DATETIME_SEPARATORS):
+            return datetime(
+                int(date_str[6:10]),
+                int(date_str[3:5]),
+                int(date_str[0:2]),
+                int(date_str[11:13]),
+                int(date_str[14:16]),
+                int(date_str[17:19]),
+            )
+        return datetime.strptime(date_str, "%d.%m.%Y %H:%M:%S")
+    except (ValueError, TypeError):
+        return None
@@ -4,11 +4,12 @@ Rust wows-replay-tool subprocess wrapper.
 Calls the pre-built wows-replay-tool binary for replay extraction and rendering.
 """
 
-import json
 import os
 import subprocess
 from typing import Optional
 
+import orjson
+
 # Rust field names (camelCase) → DynamoDB field names
 # Differences are mostly in abbreviation casing: damageAp → damageAP
 _STATS_FIELD_MAP = {
@@ -52,6 +53,12 @@ _STATS_FIELD_MAP = {
     "distance": "distance",
 }
 
+# (Rust側フィールド名, DynamoDB側フィールド名) のタプル（変換時の辞書反復・二重ルックアップを省略）
+_STATS_FIELD_ITEMS = tuple(_STATS_FIELD_MAP.items())
+
+# DynamoDB側の統計フィールド名（allPlayersStatsから自プレイヤー統計を取り出す際に使用）
+_DYNAMODB_STATS_FIELDS = frozenset(_STATS_FIELD_MAP.values())
+
 
 def get_binary_path() -> str:
     """Get path to wows-replay-tool binary."""
@@ -80,18 +87,18 @@ def extract_replay(replay_path: str, game_data_dir: Optional[str] = None) -> dic
     binary = get_binary_path()
     data_dir = game_data_dir or get_game_data_dir()
 
+    # stdoutはbytesのまま受け取り、orjsonに直接渡す（出力全体のstrデコード・コピーを省略）
     result = subprocess.run(
         [binary, "extract", "--replay", replay_path, "--game-data", data_dir],
         capture_output=True,
-        text=True,
         timeout=120,
     )
 
     if result.returncode != 0:
-        stderr = result.stderr.strip()
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
         raise RuntimeError(f"wows-replay-tool extract failed (rc={result.returncode}): {stderr}")
 
-    return json.loads(result.stdout)
+    return orjson.loads(result.stdout)
 
 
 def map_stats_to_dynamodb(rust_stats: dict) -> dict:
@@ -104,67 +111,57 @@ def map_stats_to_dynamodb(rust_stats: dict) -> dict:
     Returns:
         Stats dict with DynamoDB field names
     """
-    return {_STATS_FIELD_MAP.get(k, k): v for k, v in rust_stats.items() if k in _STATS_FIELD_MAP}
+    return {ddb_key: rust_stats[rust_key] for rust_key, ddb_key in _STATS_FIELD_ITEMS if rust_key in rust_stats}
 
 
-def build_players_info_from_rust(rust_output: dict) -> dict:
+def build_player_data_from_rust(rust_output: dict) -> tuple:
     """
-    Build players_info dict (own/allies/enemies) from Rust output.
+    Build players_info and allPlayersStats from Rust output in a single pass.
+
+    Each player's common fields are read once and shared by both outputs,
+    instead of walking the players list once per output.
 
     Args:
         rust_output: Full Rust extraction result
 
     Returns:
-        {"own": [...], "allies": [...], "enemies": [...]}
+        (players_info, all_players_stats) where players_info is
+        {"own": [...], "allies": [...], "enemies": [...]} and all_players_stats
+        is a list of player stat dicts sorted by damage descending
     """
     players_info = {"own": [], "allies": [], "enemies": []}
+    teams = (players_info["own"], players_info["allies"], players_info["enemies"])
+    all_players_stats = []
 
-    for player in rust_output.get("players", []):
-        player_data = {
-            "name": player.get("playerName", ""),
-            "shipId": player.get("shipId", 0),
-            "shipName": player.get("shipName", ""),
-            "clanTag": player.get("clanTag", ""),
-        }
-
-        relation = player.get("relation", 2)
-        if relation == 0:
-            players_info["own"].append(player_data)
-        elif relation == 1:
-            players_info["allies"].append(player_data)
-        else:
-            players_info["enemies"].append(player_data)
-
-    return players_info
-
-
-def build_all_players_stats_from_rust(rust_output: dict) -> list:
-    """
-    Build allPlayersStats array from Rust output for DynamoDB.
-
-    Args:
-        rust_output: Full Rust extraction result
-
-    Returns:
-        List of player stat dicts sorted by damage descending
-    """
-    result = []
+    # ループ内で繰り返し参照する関数・メソッドをローカル変数に束縛（グローバル/属性ルックアップを省略）
+    map_stats = map_stats_to_dynamodb
+    append_stats = all_players_stats.append
 
     for player in rust_output.get("players", []):
+        name = player.get("playerName", "")
+        ship_id = player.get("shipId", 0)
+        ship_name = player.get("shipName", "")
         relation = player.get("relation", 2)
-        team = "ally" if relation != 2 else "enemy"
-        is_own = relation == 0
+
+        teams[relation if relation in (0, 1) else 2].append(
+            {
+                "name": name,
+                "shipId": ship_id,
+                "shipName": ship_name,
+                "clanTag": player.get("clanTag", ""),
+            }
+        )
 
         # Map stats to DynamoDB format
-        stats_data = map_stats_to_dynamodb(player.get("stats", {}))
+        stats_data = map_stats(player.get("stats", {}))
 
         # Add player info
-        stats_data["playerName"] = player.get("playerName", "")
-        stats_data["team"] = team
-        stats_data["shipId"] = player.get("shipId", 0)
-        stats_data["shipName"] = player.get("shipName", "")
+        stats_data["playerName"] = name
+        stats_data["team"] = "ally" if relation != 2 else "enemy"
+        stats_data["shipId"] = ship_id
+        stats_data["shipName"] = ship_name
         stats_data["shipClass"] = player.get("shipClass", "")
-        stats_data["isOwn"] = is_own
+        stats_data["isOwn"] = relation == 0
 
         # Add build info
         build = player.get("build", {})
@@ -176,24 +173,58 @@ def build_all_players_stats_from_rust(rust_output: dict) -> list:
         if upgrades:
             stats_data["upgrades"] = upgrades
 
-        result.append(stats_data)
+        append_stats(stats_data)
 
     # Sort by damage descending
-    result.sort(key=lambda x: x.get("damage", 0), reverse=True)
+    all_players_stats.sort(key=lambda x: x.get("damage", 0), reverse=True)
 
-    return result
+    return players_info, all_players_stats
 
 
-def get_own_player_stats(rust_output: dict) -> Optional[dict]:
+def build_players_info_from_rust(rust_output: dict) -> dict:
+    """
+    Build players_info dict (own/allies/enemies) from Rust output.
+
+    Args:
+        rust_output: Full Rust extraction result
+
+    Returns:
+        {"own": [...], "allies": [...], "enemies": [...]}
+    """
+    return build_player_data_from_rust(rust_output)[0]
+
+
+def build_all_players_stats_from_rust(rust_output: dict) -> list:
+    """
+    Build allPlayersStats array from Rust output for DynamoDB.
+
+    Args:
+        rust_output: Full Rust extraction result
+
+    Returns:
+        List of player stat dicts sorted by damage descending
+    """
+    return build_player_data_from_rust(rust_output)[1]
+
+
+def get_own_player_stats(rust_output: dict, all_players_stats: Optional[list] = None) -> Optional[dict]:
     """
     Extract own player's stats from Rust output, mapped to DynamoDB format.
 
     Args:
         rust_output: Full Rust extraction result
+        all_players_stats: Result of build_all_players_stats_from_rust. When given,
+            the already-mapped own entry is reused instead of re-mapping the Rust stats.
 
     Returns:
         Own player's stats dict or None
     """
+    if all_players_stats is not None:
+        for stats_data in all_players_stats:
+            if stats_data.get("isOwn"):
+                return {k: v for k, v in stats_data.items() if k in _DYNAMODB_STATS_FIELDS}
+        return None
+
     for player in rust_output.get("players", []):
         if player.get("relation") == 0:
             return map_stats_to_dynamodb(player.get("stats", {}))